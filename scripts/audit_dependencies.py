@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
+import argparse
 import json
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 from rich.console import Console
 from rich.panel import Panel
-from rich.table import Table
+from rich.table import Column, Table
 
 console = Console()
 
+# Persistent HTTP cache for pip-audit's PyPI queries (CacheControl/ETag based).
+# Override with KPF_AUDIT_CACHE_DIR; CI caches this directory between runs.
+AUDIT_CACHE_DIR = Path(
+    os.environ.get("KPF_AUDIT_CACHE_DIR", Path.home() / ".cache" / "kpf-audit")
+).expanduser()
+
 
 def run_command(command):
     try:
@@ -18,30 +28,44 @@ def run_command(command):
         return None
 
 
-def check_security():
-    console.print("[bold blue]Checking for security vulnerabilities...[/bold blue]")
+def run_command_json(command):
+    """Run a command and parse its JSON stdout straight from the binary pipe.
 
-    # Run pip-audit using uv run
-    result = run_command(["uv", "run", "--with", "pip-audit", "pip-audit", "--format", "json"])
+    Returns:
+        Tuple of (data, returncode), where data is None if the output was not valid
+        JSON, or None if the command was not found.
+    """
+    try:
+        # stderr is discarded so a chatty command can never block on a full pipe
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        return None
 
-    if result is None:
-        console.print("[bold red]Error: uv or pip-audit not found.[/bold red]")
-        return False, []
+    with proc:
+        try:
+            data = json.load(proc.stdout)
+        except json.JSONDecodeError:
+            data = None
+    return data, proc.returncode
+
+
+def check_security():
+    console.print("[bold blue]Checking for security vulnerabilities...[/bold blue]")
 
-    if result.returncode != 0 and not result.stdout:
-        console.print(f"[bold red]Error running pip-audit:[/bold red] {result.stderr}")
+    # Audit in-process instead of spawning `uv run --with pip-audit pip-audit`
+    try:
+        from pip_audit._dependency_source import PipSource, PipSourceError
+        from pip_audit._service import PyPIService, ServiceError
+    except ImportError:
+        console.print("[bold red]Error: pip-audit not installed (run `uv sync`).[/bold red]")
         return False, []
 
     try:
-        data = json.loads(result.stdout)
-        # pip-audit format: {"dependencies": [{"name": "...", "version": "...", "vulns": [...]}, ...]}
-        all_deps = data.get("dependencies", [])
-        vulnerabilities = [d for d in all_deps if d.get("vulns")]
-    except json.JSONDecodeError:
-        # If no vulnerabilities found, pip-audit might return empty list or different output
-        if "No known vulnerabilities found" in result.stderr or not result.stdout:
-            return True, []
-        console.print("[bold red]Failed to parse pip-audit output.[/bold red]")
+        results = PyPIService(cache_dir=AUDIT_CACHE_DIR).query_all(PipSource().collect())
+        # Keep only resolved dependencies that have at least one known vulnerability
+        vulnerabilities = [(dep, vulns) for dep, vulns in results if vulns and not dep.is_skipped()]
+    except (PipSourceError, ServiceError) as e:
+        console.print(f"[bold red]Error running pip-audit:[/bold red] {e}")
         return False, []
 
     if not vulnerabilities:
@@ -51,23 +75,20 @@ def check_security():
 
 
 def check_outdated():
-    console.print("\n[bold blue]Checking for outdated dependencies...[/bold blue]")
+    console.print("[bold blue]Checking for outdated dependencies...[/bold blue]")
 
-    result = run_command(["uv", "pip", "list", "--outdated", "--format", "json"])
+    result = run_command_json(["uv", "pip", "list", "--outdated", "--format", "json"])
 
     if result is None:
         console.print("[bold red]Error: uv not found.[/bold red]")
         return []
 
-    if result.returncode != 0:
+    outdated, returncode = result
+    if returncode != 0 or outdated is None:
         # If no packages are outdated, uv might return error or empty
         return []
 
-    try:
-        outdated = json.loads(result.stdout)
-        return outdated
-    except json.JSONDecodeError:
-        return []
+    return outdated
 
 
 def run_sync():
@@ -82,9 +103,27 @@ def run_sync():
 
 
 def main():
+    parser = argparse.ArgumentParser(description="KPF dependency & security audit")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Run `uv sync` before running the checks",
+    )
+    args = parser.parse_args()
+
     console.print(Panel.fit("KPF Dependency & Security Audit", style="bold magenta"))
 
-    security_ok, vulnerabilities = check_security()
+    # uv sync mutates the environment, so it must finish before either check starts
+    if args.sync:
+        run_sync()
+
+    # Both checks are independent and network-bound; run them concurrently and
+    # report the results sequentially once both have finished.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        security_future = executor.submit(check_security)
+        outdated_future = executor.submit(check_outdated)
+        security_ok, vulnerabilities = security_future.result()
+        outdated = outdated_future.result()
 
     if security_ok:
         console.print("[bold green]✅ No known vulnerabilities found.[/bold green]")
@@ -92,33 +131,37 @@ def main():
         console.print(
             f"[bold red]❌ Found {len(vulnerabilities)} packages with vulnerabilities![/bold red]"
         )
-        table = Table(title="Vulnerabilities")
-        table.add_column("Package", style="cyan")
-        table.add_column("Version", style="magenta")
-        table.add_column("ID", style="yellow")
-        table.add_column("Fix Versions")
-
-        for pkg in vulnerabilities:
-            name = pkg.get("name")
-            version = pkg.get("version")
-            for vuln in pkg.get("vulns", []):
-                table.add_row(
-                    name, version, vuln.get("id"), ", ".join(vuln.get("fix_versions", ["N/A"]))
-                )
+        rows = [
+            (dep.name, str(dep.version), vuln.id, ", ".join(map(str, vuln.fix_versions)) or "N/A")
+            for dep, vulns in vulnerabilities
+            for vuln in vulns
+        ]
+        table = Table(
+            Column("Package", style="cyan", no_wrap=True),
+            Column("Version", style="magenta", no_wrap=True),
+            Column("ID", style="yellow", no_wrap=True),
+            Column("Fix Versions"),
+            title="Vulnerabilities",
+            expand=False,
+        )
+        for row in rows:
+            table.add_row(*row)
         console.print(table)
-    run_sync()
-    outdated = check_outdated()
+
     if not outdated:
         console.print("[bold green]✅ All dependencies are up to date.[/bold green]")
     else:
         console.print(f"[bold yellow]ℹ️ Found {len(outdated)} outdated dependencies.[/bold yellow]")
-        table = Table(title="Outdated Dependencies")
-        table.add_column("Package", style="cyan")
-        table.add_column("Installed", style="magenta")
-        table.add_column("Latest", style="green")
-
-        for item in outdated:
-            table.add_row(item["name"], item["version"], item["latest_version"])
+        rows = [(item["name"], item["version"], item["latest_version"]) for item in outdated]
+        table = Table(
+            Column("Package", style="cyan", no_wrap=True),
+            Column("Installed", style="magenta", no_wrap=True),
+            Column("Latest", style="green", no_wrap=True),
+            title="Outdated Dependencies",
+            expand=False,
+        )
+        for row in rows:
+            table.add_row(*row)
         console.print(table)
 
     if not security_ok:
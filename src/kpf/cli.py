@@ -26,7 +26,19 @@ def str_to_bool(value):
         raise argparse.ArgumentTypeError(f"Boolean value expected, got: {value}")
 
 
+# Parser built by create_parser(); construction is the bulk of argparse's cost
+_parser: argparse.ArgumentParser | None = None
+
+
 def create_parser() -> argparse.ArgumentParser:
+    """Return the argument parser, building it on first use."""
+    global _parser
+    if _parser is None:
+        _parser = _build_parser()
+    return _parser
+
+
+def _build_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser."""
     parser = argparse.ArgumentParser(
         prog="kpf",
@@ -200,6 +212,14 @@ History docs: https://github.com/jessegoodier/kpf#history-mode
         help="Delay in seconds between reconnection attempts (default: 5)",
     )
 
+    config_group.add_argument(
+        "--debounce-ms",
+        type=int,
+        default=None,
+        metavar="MS",
+        help="Wait for endpoint changes to settle before restarting (default: 500)",
+    )
+
     # Positional arguments for legacy port-forward syntax
     parser.add_argument("args", nargs="*", help="kubectl port-forward arguments (legacy mode)")
 
@@ -226,6 +246,7 @@ def merge_config_with_cli_args(config, args):
         "auto_reconnect": "autoReconnect",
         "reconnect_attempts": "reconnectAttempts",
         "reconnect_delay": "reconnectDelaySeconds",
+        "debounce_ms": "endpointDebounceMs",
     }
 
     for arg_name, config_key in arg_mapping.items():
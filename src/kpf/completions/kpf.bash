@@ -8,7 +8,7 @@ _kpf_completion() {
     # Flags
     case ${cur} in
         -*)
-            COMPREPLY=( $(compgen -W "--namespace -n --all -A --all-ports -l --check -c --debug -d --debug-terminal -t --run-http-health-checks --listen-all -z --prompt-namespace -p --auto-reconnect --auto-select-free-port --reconnect-attempts --reconnect-delay --show-context --show-kubeconfig --show-direct-command --create-config --show-config --completions --version -v --help -h" -- ${cur}) )
+            COMPREPLY=( $(compgen -W "--namespace -n --all -A --all-ports -l --check -c --debug -d --debug-terminal -t --run-http-health-checks --listen-all -z --prompt-namespace -p --auto-reconnect --auto-select-free-port --reconnect-attempts --reconnect-delay --debounce-ms --show-context --show-kubeconfig --show-direct-command --create-config --show-config --completions --version -v --help -h" -- ${cur}) )
             return 0
             ;;
     esac
@@ -21,7 +21,7 @@ _kpf_completion() {
             COMPREPLY=( $(compgen -W "${namespaces}" -- ${cur}) )
             return 0
             ;;
-        --reconnect-attempts|--reconnect-delay)
+        --reconnect-attempts|--reconnect-delay|--debounce-ms)
             # Numeric argument - no completion
             return 0
             ;;
@@ -44,7 +44,7 @@ _kpf_completion() {
         # Skip flags and their arguments
         if [[ "$word" == -* ]]; then
             # Skip next word if this is a flag that takes an argument
-            if [[ "$word" == "-n" || "$word" == "--namespace" || "$word" == "--reconnect-attempts" || "$word" == "--reconnect-delay" ]]; then
+            if [[ "$word" == "-n" || "$word" == "--namespace" || "$word" == "--reconnect-attempts" || "$word" == "--reconnect-delay" || "$word" == "--debounce-ms" ]]; then
                 ((i++))
             fi
             continue
@@ -27,6 +27,7 @@ class KpfConfig:
         "saveCommandHistory": False,  # local history
         "saveHistoryLocation": "~/.config/kpf/command-history",
         "restartThrottleSeconds": 5,
+        "endpointDebounceMs": 500,  # Coalesce bursts of endpoint changes into one restart
         "networkWatchdogEnabled": True,  # Monitor K8s API connectivity
         "networkWatchdogInterval": 5,  # Seconds between checks
         "networkWatchdogFailureThreshold": 2,  # Consecutive failures before restart
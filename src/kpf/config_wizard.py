@@ -113,6 +113,17 @@ _OPTIONS = [
             "when endpoints are continuously changing."
         ),
     ),
+    _Option(
+        key="endpointDebounceMs",
+        kind="int",
+        default=500,
+        group="Reconnection",
+        description=(
+            "Milliseconds to wait for endpoint changes to settle before restarting. "
+            "A rolling deployment then causes one restart instead of one per pod. "
+            "Set to 0 to restart on every change."
+        ),
+    ),
     _Option(
         key="networkWatchdogEnabled",
         kind="bool",
@@ -32,6 +32,7 @@ class ConnectivityChecker:
         self.CONNECTIVITY_FAILURE_TIMEOUT = 10.0  # Exit after 10 seconds of failures
         self.HTTP_TIMEOUT = 3.0  # HTTP request timeout
         self.HTTP_RETRY_INTERVAL = 2.0  # Minimum interval between HTTP retries
+        self.HEALTH_RETRY_INTERVAL = 0.1  # Delay between startup health probes
 
         # Connection health tracking
         self.last_http_attempt_time = 0
@@ -107,32 +108,29 @@ class ConnectivityChecker:
 
         self.debug_print(f"Testing port-forward health on port {local_port}")
 
-        # Wait for port to become active (kubectl port-forward takes a moment to start)
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        # Wait for port to become active (kubectl port-forward takes a moment to start).
+        # A localhost connect is answered immediately, so probe often rather than sleeping
+        # in large steps; the first probe after kubectl binds the port succeeds.
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
             try:
                 # Try to connect to the port to see if it's active
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                     sock.settimeout(1)
                     result = sock.connect_ex(("localhost", local_port))
                     if result == 0:
-                        # Connected (0) or connection refused (61) - both mean port-forward is working
                         self.debug_print(
                             f"Port-forward appears to be working on port {local_port} [green](result: {result})[/green]"
                         )
                         return True
-                    elif result == 61:
-                        self.debug_print(
-                            f"Port-forward health check failed on port {local_port} [red](result: {result})[/red]"
-                        )
-                    else:
-                        self.debug_print(
-                            f"Port-forward health check failed on port {local_port} [red](result: {result})[/red]"
-                        )
+                    self.debug_print(
+                        f"Port-forward health check failed on port {local_port} [red](result: {result})[/red]",
+                        rate_limit=True,
+                    )
             except OSError:
                 pass
 
-            time.sleep(0.5)
+            time.sleep(self.HEALTH_RETRY_INTERVAL)
 
         self.debug_print(
             f"Port-forward health check failed - port {local_port} not responding after {timeout}s"
@@ -1,7 +1,8 @@
+import heapq
 import os
-import socket
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from rich import box
@@ -12,6 +13,18 @@ from rich.text import Text
 
 from .history import HistoryEntry, load_history
 from .kubernetes import KubernetesClient, ServiceInfo
+from .validators import is_port_available
+
+console = Console()
+
+# Endpoint status cells, built once so rows don't format and re-parse markup
+_STATUS_OK = Text("✓", style="green")
+_STATUS_MISSING = Text("✗", style="red")
+
+
+def _resource_sort_key(resource: ServiceInfo) -> tuple[str, str, str]:
+    """Sort resources by namespace, then type, then name."""
+    return (resource.namespace, resource.service_type, resource.name)
 
 
 class ServiceSelector:
@@ -21,10 +34,12 @@ class ServiceSelector:
         self.k8s_client = k8s_client
         if k8s_client is not None:
             self._check_kubectl()
-        self.console = Console()
+        self.console = console
         # Simple compatibility mode for terminals (now default for stability)
         # Disable by setting env var KPF_TTY_COMPAT=0
         self.compat_mode = os.environ.get("KPF_TTY_COMPAT") != "0"
+        # Rich prompts are only worth their rendering cost on an interactive terminal
+        self._tty = sys.stdin.isatty() and sys.stdout.isatty()
         self._history_enabled = False
         self._history_folder: Path | None = None
         if config and config.get("saveCommandHistory", False):
@@ -83,6 +98,21 @@ class ServiceSelector:
 
         return "", current_index, False
 
+    def _ask_int(self, prompt: str, default: int, show_default: bool = True) -> int:
+        """Prompt for an integer, falling back to plain input() when not on a TTY."""
+        if self._tty:
+            return IntPrompt.ask(prompt, default=default, show_default=show_default)
+
+        suffix = f" [{default}]" if show_default else ""
+        while True:
+            response = input(f"{prompt}{suffix}: ").strip()
+            if not response:
+                return default
+            try:
+                return int(response)
+            except ValueError:
+                self.console.print("[red]Please enter a valid integer number[/red]")
+
     def _check_kubectl(self):
         """Check if kubectl is available."""
         try:
@@ -105,12 +135,8 @@ class ServiceSelector:
 
     def _is_port_available(self, port: int) -> bool:
         """Check if a port is available on localhost."""
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.bind(("localhost", port))
-                return True
-        except OSError:
-            return False
+        is_available, _error_reason = is_port_available(port)
+        return is_available
 
     def _find_available_port(self, starting_port: int, max_attempts: int = 10) -> int:
         """Find the next available port starting from the given port."""
@@ -132,17 +158,23 @@ class ServiceSelector:
 
         self.console.print(f"\n[bold cyan]Services in namespace: {namespace}[/bold cyan]")
 
-        # Get services
-        services = self.k8s_client.get_services_in_namespace(namespace, check_endpoints)
-
-        # Optionally include pods and deployments
-        all_resources = services.copy()
+        # Get services, optionally fetching pods and deployments concurrently
         if include_all_ports:
-            pods = self.k8s_client.get_pods_with_ports(namespace)
-            deployments = self.k8s_client.get_deployments_with_ports(namespace)
-            all_resources.extend(pods)
-            all_resources.extend(deployments)
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                services_future = executor.submit(
+                    self.k8s_client.get_services_in_namespace, namespace, check_endpoints
+                )
+                pods_future = executor.submit(self.k8s_client.get_pods_with_ports, namespace)
+                deployments_future = executor.submit(
+                    self.k8s_client.get_deployments_with_ports, namespace
+                )
+                all_resources = services_future.result().copy()
+                all_resources.extend(pods_future.result())
+                all_resources.extend(deployments_future.result())
             all_resources.sort(key=lambda r: (r.service_type, r.name))
+        else:
+            services = self.k8s_client.get_services_in_namespace(namespace, check_endpoints)
+            all_resources = services.copy()
 
         if not all_resources:
             self.console.print(f"[yellow]No resources found in namespace '{namespace}'[/yellow]")
@@ -173,19 +205,18 @@ class ServiceSelector:
             self.console.print("[yellow]No services found in any namespace[/yellow]")
             return []
 
-        # Flatten and add pods/deployments if requested
-        all_resources = []
-        for namespace, services in all_services_by_ns.items():
-            all_resources.extend(services)
+        # The KubernetesClient helpers return each namespace's services, pods and
+        # deployments sorted by name, so every list is already ordered by
+        # (namespace, type, name) and they can be merged instead of re-sorted.
+        sorted_lists = list(all_services_by_ns.values())
 
-            if include_all_ports:
-                pods = self.k8s_client.get_pods_with_ports(namespace)
-                deployments = self.k8s_client.get_deployments_with_ports(namespace)
-                all_resources.extend(pods)
-                all_resources.extend(deployments)
+        if include_all_ports:
+            # Fetch pods/deployments for each namespace concurrently
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                for workloads in executor.map(self._get_workload_resources, all_services_by_ns):
+                    sorted_lists.extend(workloads)
 
-        # Sort by namespace, then type, then name
-        all_resources.sort(key=lambda r: (r.namespace, r.service_type, r.name))
+        all_resources = list(heapq.merge(*sorted_lists, key=_resource_sort_key))
 
         # Get user selection
         return self._prompt_for_service_selection(
@@ -195,6 +226,14 @@ class ServiceSelector:
             check_endpoints=check_endpoints,
         )
 
+    def _get_workload_resources(
+        self, namespace: str
+    ) -> tuple[list[ServiceInfo], list[ServiceInfo]]:
+        """Get pods and deployments with exposed ports in a namespace."""
+        pods = self.k8s_client.get_pods_with_ports(namespace)
+        deployments = self.k8s_client.get_deployments_with_ports(namespace)
+        return pods, deployments
+
     def _build_services_table(
         self,
         resources: list[ServiceInfo],
@@ -284,9 +323,7 @@ class ServiceSelector:
                     row.insert(1, type_value)
 
             if check_endpoints:
-                status_color = "green" if resource.has_endpoints else "red"
-                status_text = "✓" if resource.has_endpoints else "✗"
-                row.append(f"[{status_color}]{status_text}[/{status_color}]")
+                row.append(_STATUS_OK if resource.has_endpoints else _STATUS_MISSING)
 
             # Highlight selected row with a visible pointer and background color
             is_selected = selected_index is not None and i == selected_index
@@ -460,7 +497,7 @@ class ServiceSelector:
                         check_endpoints=check_endpoints_flag,
                         include_all_ports=include_all_ports_flag,
                     )
-                    selection = IntPrompt.ask("\nSelect a service", default=1, show_default=True)
+                    selection = self._ask_int("\nSelect a service", default=1, show_default=True)
 
                 if selection < 1 or selection > len(resources):
                     self.console.print("[red]Invalid selection[/red]")
@@ -616,7 +653,7 @@ class ServiceSelector:
                 # Render a single static table for numeric selection
                 port_table = self._build_port_table(resource)
                 self.console.print(port_table)
-                selection = IntPrompt.ask("\nSelect a port", default=1, show_default=True)
+                selection = self._ask_int("\nSelect a port", default=1, show_default=True)
 
             if selection is None or selection < 1 or selection > len(resource.ports):
                 self.console.print("[red]Invalid port selection[/red]")
@@ -763,7 +800,7 @@ class ServiceSelector:
             if selection is None:
                 table = self._build_history_table(entries)
                 self.console.print(table)
-                selection = IntPrompt.ask(
+                selection = self._ask_int(
                     "\nSelect a history entry (0 to go back)", default=0, show_default=True
                 )
                 if selection == 0:
@@ -791,7 +828,7 @@ class ServiceSelector:
 
                 # Check if suggested port is available
                 if self._is_port_available(suggested_port):
-                    local_port = IntPrompt.ask(
+                    local_port = self._ask_int(
                         f"Local port (press Enter for {suggested_port})",
                         default=suggested_port,
                         show_default=False,
@@ -802,7 +839,7 @@ class ServiceSelector:
                     self.console.print(
                         f"[yellow]Port {suggested_port} is already in use, suggesting port {alternative_port}[/yellow]"
                     )
-                    local_port = IntPrompt.ask(
+                    local_port = self._ask_int(
                         f"Local port (press Enter for {alternative_port})",
                         default=alternative_port,
                         show_default=False,
@@ -812,7 +849,7 @@ class ServiceSelector:
                 # Check if the remote port is available
                 if self._is_port_available(remote_port):
                     # Port is available, use as default
-                    local_port = IntPrompt.ask(
+                    local_port = self._ask_int(
                         f"Local port (press Enter for {remote_port})",
                         default=remote_port,
                         show_default=False,
@@ -823,7 +860,7 @@ class ServiceSelector:
                     self.console.print(
                         f"[yellow]Port {remote_port} is already in use, suggesting port {suggested_port}[/yellow]"
                     )
-                    local_port = IntPrompt.ask(
+                    local_port = self._ask_int(
                         f"Local port (press Enter for {suggested_port})",
                         default=suggested_port,
                         show_default=False,
@@ -999,7 +1036,7 @@ class ServiceSelector:
 
                 table = self._build_namespace_table(display_namespaces)
                 self.console.print(table)
-                selection = IntPrompt.ask("\nSelect a namespace", default=1, show_default=True)
+                selection = self._ask_int("\nSelect a namespace", default=1, show_default=True)
 
             if selection is None or selection < 1 or selection > len(namespaces):
                 self.console.print("[red]Invalid selection[/red]")
@@ -1,3 +1,6 @@
+import contextlib
+import os
+import selectors
 import subprocess
 import threading
 import time
@@ -11,6 +14,9 @@ from .validators import extract_local_port
 
 console = Console()
 
+# kubectl prints this once the local listener is bound
+FORWARDING_MARKER = b"Forwarding from"
+
 
 class PortForwarder:
     def __init__(
@@ -22,6 +28,7 @@ class PortForwarder:
         config=None,
         history_logger=None,
         no_health_check: bool = False,
+        context: str | None = None,
     ):
         self.port_forward_args = port_forward_args
         self.shutdown_event = shutdown_event
@@ -30,6 +37,7 @@ class PortForwarder:
         self.config = config
         self.history_logger = history_logger
         self.no_health_check = no_health_check
+        self.context = context  # Already-resolved kubectl context, if the caller has one
 
         self.local_port = extract_local_port(port_forward_args)
         self.connectivity_checker = ConnectivityChecker(
@@ -43,6 +51,7 @@ class PortForwarder:
         else:
             self.RESTART_THROTTLE_SECONDS = 5
         self.pending_restart = False
+        self.READY_TIMEOUT_SECONDS = 10
 
         # Reconnection config
         self.reconnect_attempts_made = 0
@@ -59,9 +68,16 @@ class PortForwarder:
 
     def start(self):
         """Start the port-forwarder thread."""
-        self.thread = threading.Thread(target=self.port_forward_thread)
+        self.thread = threading.Thread(target=self._run)
         self.thread.start()
 
+    def _run(self):
+        """Thread entry point; always signals shutdown when the thread exits."""
+        try:
+            self.port_forward_thread()
+        finally:
+            self.shutdown_event.set()
+
     def is_alive(self):
         return self.thread and self.thread.is_alive()
 
@@ -98,7 +114,6 @@ class PortForwarder:
         It also monitors port connectivity every 5 seconds and restarts if connection fails.
         """
         self.debug_print(f"Port-forward thread started with args: {self.port_forward_args}")
-        proc = None
         args = self.port_forward_args
         local_port = self.local_port
         first_run = True
@@ -119,16 +134,17 @@ class PortForwarder:
                     if show_direct_command:
                         context = None
                         if self.config and self.config.get("showDirectCommandIncludeContext", True):
-                            from .kubernetes import KubernetesClient
+                            context = self.context
+                            if not context:
+                                from .kubernetes import KubernetesClient
 
-                            k8s = KubernetesClient()
-                            context = k8s.get_current_context()
+                                k8s = KubernetesClient(check_kubectl=False)
+                                context = k8s.get_current_context()
 
                         kubeconfig = None
                         if self.config and self.config.get(
                             "showDirectCommandIncludeKubeconfig", True
                         ):
-                            import os
                             from pathlib import Path
 
                             for i, flag in enumerate(args):
@@ -168,18 +184,20 @@ class PortForwarder:
                     f"\n[green][Port-Forwarder] Starting: kubectl port-forward {' '.join(args)}[/green]"
                 )
                 self.debug_print(f"Executing: kubectl port-forward {' '.join(args)}")
+                # stderr is never read, so don't give kubectl a pipe it could fill
                 self.proc = subprocess.Popen(
                     ["kubectl", "port-forward"] + args,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
                 )
                 self.debug_print(f"Port-forward process started with PID: {self.proc.pid}")
 
                 # Show connecting spinner while waiting for port-forward to start
                 spinner = Spinner("dots", text="Connecting...")
                 with Live(spinner, console=console, refresh_per_second=10):
-                    # Give port-forward a moment to start
-                    time.sleep(2)
+                    # Wait until kubectl reports its listener is bound
+                    self._wait_until_forwarding(self.proc)
+                self._discard_output(self.proc)
 
                 # Test if port-forward is healthy (skip if health checks disabled)
                 if (
@@ -190,9 +208,11 @@ class PortForwarder:
                     console.print(
                         "[yellow]This may indicate the service is not running or the port mapping is incorrect[/yellow]"
                     )
-                    if proc:
-                        self.debug_print(f"Terminating failed port-forward process PID: {proc.pid}")
-                        self._kill_proc(proc)
+                    if self.proc:
+                        self.debug_print(
+                            f"Terminating failed port-forward process PID: {self.proc.pid}"
+                        )
+                        self.terminate_process()
 
                     # Instead of shutting down immediately, set restart event to try again
                     console.print("[yellow]Will retry port-forward in a moment...[/yellow]")
@@ -339,7 +359,8 @@ class PortForwarder:
                         self.restart_event.set()
                         break
 
-                    time.sleep(1.0)  # Sleep for 1 second between loop iterations
+                    # Tick once per second, but wake immediately on shutdown
+                    self.shutdown_event.wait(1.0)
 
                 if self.proc and (self.restart_event.is_set() or self.shutdown_event.is_set()):
                     if self.restart_event.is_set():
@@ -360,6 +381,60 @@ class PortForwarder:
             self.debug_print("Final cleanup: terminating port-forward process")
             self.terminate_process()
 
+    def _wait_until_forwarding(self, proc) -> bool:
+        """Wait for kubectl to print "Forwarding from ...", i.e. its listener is bound.
+
+        Falls back to a fixed delay when the pipe can't be watched (e.g. on Windows).
+
+        Returns:
+            True if the readiness line was seen, False on timeout, exit or fallback
+        """
+        deadline = time.monotonic() + self.READY_TIMEOUT_SECONDS
+        output = b""
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(proc.stdout, selectors.EVENT_READ)
+                while not self.shutdown_event.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.debug_print("Timed out waiting for kubectl to start forwarding")
+                        return False
+                    if not selector.select(min(remaining, 0.1)):
+                        continue
+                    chunk = os.read(proc.stdout.fileno(), 4096)
+                    if not chunk:
+                        self.debug_print("kubectl port-forward exited before forwarding")
+                        return False
+                    # Keep a short tail so a marker split across reads is still found
+                    output = output[-len(FORWARDING_MARKER) :] + chunk
+                    if FORWARDING_MARKER in output:
+                        self.debug_print("kubectl port-forward is ready")
+                        return True
+        except (OSError, ValueError, TypeError) as e:
+            self.debug_print(f"Cannot watch kubectl output ({e}), waiting 2s instead")
+            time.sleep(2)
+        return False
+
+    def _discard_output(self, proc):
+        """Keep reading kubectl's stdout in the background until it exits.
+
+        kubectl logs a "Handling connection for <port>" line per connection; unread,
+        those fill the pipe and kubectl blocks after a few thousand connections.
+
+        Returns:
+            The daemon thread doing the reads
+        """
+
+        def drain():
+            with contextlib.suppress(OSError, ValueError, TypeError):
+                fd = proc.stdout.fileno()
+                while os.read(fd, 65536):
+                    pass
+
+        thread = threading.Thread(target=drain, daemon=True)
+        thread.start()
+        return thread
+
     def terminate_process(self):
         """Terminate the port-forward process safely."""
         if hasattr(self, "proc") and self.proc:
@@ -41,8 +41,16 @@ class ServiceInfo:
 class KubernetesClient:
     """Client for interacting with Kubernetes via kubectl."""
 
-    def __init__(self):
-        self._check_kubectl()
+    def __init__(self, check_kubectl: bool = True):
+        """Initialize the client.
+
+        Args:
+            check_kubectl: Verify kubectl works before use. Callers that have already
+                validated kubectl can skip the extra `kubectl version` round-trip.
+        """
+        self._current_namespace: str | None = None
+        if check_kubectl:
+            self._check_kubectl()
 
     def _check_kubectl(self):
         """Check if kubectl is available."""
@@ -52,7 +60,16 @@ class KubernetesClient:
             raise RuntimeError("kubectl is not available or not configured properly")
 
     def get_current_namespace(self) -> str:
-        """Get the current namespace from kubectl context."""
+        """Get the current namespace from kubectl context.
+
+        The result is cached for the lifetime of the client.
+        """
+        if self._current_namespace is None:
+            self._current_namespace = self._read_current_namespace()
+        return self._current_namespace
+
+    def _read_current_namespace(self) -> str:
+        """Read the current namespace from the kubeconfig via kubectl."""
         try:
             result = subprocess.run(
                 [
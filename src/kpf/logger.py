@@ -1,4 +1,5 @@
 import time
+from collections import OrderedDict
 
 from rich.console import Console
 
@@ -9,8 +10,10 @@ console = Console()
 class Debug:
     def __init__(self):
         self.enabled = False
-        self.message_timestamps = {}
+        # Last-print time (monotonic ns) per message key, bounded as an LRU
+        self.message_timestamps: OrderedDict[int, int] = OrderedDict()
         self.MESSAGE_INTERVAL = 2.0  # Minimum interval between repeated debug messages
+        self.MAX_TRACKED_MESSAGES = 256  # Cap on remembered rate-limited messages
 
     def print(self, message: str, rate_limit: bool = False):
         """Print debug message with optional rate limiting.
@@ -23,14 +26,18 @@ class Debug:
             return
 
         if rate_limit:
-            current_time = time.time()
-            message_key = message[:50]  # Use first 50 chars as key to group similar messages
+            current_time = time.monotonic_ns()
+            # Use a hash of the first 50 chars as key to group similar messages
+            message_key = hash(message[:50]) & 0xFFFFFFFF
 
-            last_time = self.message_timestamps.get(message_key, 0)
-            if current_time - last_time < self.MESSAGE_INTERVAL:
+            last_time = self.message_timestamps.get(message_key)
+            if last_time is not None and current_time - last_time < self.MESSAGE_INTERVAL * 1e9:
                 return  # Rate limited
 
             self.message_timestamps[message_key] = current_time
+            self.message_timestamps.move_to_end(message_key)
+            if len(self.message_timestamps) > self.MAX_TRACKED_MESSAGES:
+                self.message_timestamps.popitem(last=False)
 
         console.print(f"[dim cyan][DEBUG][/dim cyan] {message}")
 
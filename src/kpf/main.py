@@ -4,7 +4,6 @@ import signal
 import subprocess
 import sys
 import threading
-import time
 from pathlib import Path
 
 from .forwarder import PortForwarder
@@ -25,26 +24,36 @@ from .watcher import EndpointWatcher
 restart_event = threading.Event()
 shutdown_event = threading.Event()
 
+# Matches patterns like 'svc/my-service' or 'pod/my-pod'
+# We accept any resource type (characters, numbers, dashes, dots). Used with fullmatch
+# and a slash-free name so paths like 'configs/dev/kubeconfig' are not taken as resources.
+_RESOURCE_RE = re.compile(r"([a-z0-9.-]+)/([^/\s]+)")
+
+# Flags whose next argument is their value, never the resource: a value such as
+# './dev.yaml' or 'kube/config' would otherwise match _RESOURCE_RE
+_FLAGS_WITH_VALUE = frozenset({"-n", "--namespace", "--context", "--kubeconfig", "--address"})
+
 # Track Ctrl+C presses for force exit
 _sigint_count = 0
 
-# Initialize Rich console
-
 
 def _signal_handler(signum, frame):
-    """Handle SIGINT (Ctrl+C) with force exit on second press."""
+    """Handle SIGINT (Ctrl+C) with force exit on second press.
+
+    The handler can interrupt the main thread mid-print, so it does no Rich I/O;
+    the main loop reports the graceful shutdown once shutdown_event wakes it.
+    """
     global _sigint_count
     _sigint_count += 1
 
     if _sigint_count == 1:
-        console.print("\n[yellow]Ctrl+C detected. Shutting down gracefully...[/yellow]")
-        console.print("[yellow]Press Ctrl+C again to force exit.[/yellow]")
-        debug.print("First SIGINT received, initiating graceful shutdown")
         shutdown_event.set()
     else:
-        console.print("\n[red]Force exit requested. Terminating immediately...[/red]")
-        debug.print("Second SIGINT received, forcing exit")
-        sys.exit(1)
+        try:
+            os.write(sys.stderr.fileno(), b"\nForce exit requested. Terminating immediately...\n")
+        except OSError:
+            pass
+        os._exit(1)
 
 
 def get_port_forward_args(args):
@@ -69,14 +78,26 @@ def get_watcher_args(port_forward_args, kubectl_global_flags=None):
     namespace = None
     resource_name = None
 
-    # Find namespace
-    try:
-        n_index = port_forward_args.index("-n")
-        if n_index + 1 < len(port_forward_args):
-            namespace = port_forward_args[n_index + 1]
-            debug.print(f"Found namespace in args: {namespace}")
-    except ValueError:
-        pass  # '-n' flag not found
+    # Find namespace and resource name (e.g., 'svc/frontend') in a single pass
+    skip_value = False
+    for i, arg in enumerate(port_forward_args):
+        if skip_value:
+            skip_value = False
+            continue
+        if arg in _FLAGS_WITH_VALUE:
+            skip_value = True
+            if namespace is None and arg == "-n" and i + 1 < len(port_forward_args):
+                namespace = port_forward_args[i + 1]
+                debug.print(f"Found namespace in args: {namespace}")
+        elif resource_name is None:
+            match = _RESOURCE_RE.fullmatch(arg)
+            if match:
+                # The resource name is the second group in the regex match
+                resource_name = match.group(2)
+                debug.print(f"Found resource: {match.group(1)}/{resource_name}")
+
+        if namespace is not None and resource_name is not None:
+            break
 
     # If namespace not found or incomplete, use current context namespace
     if namespace is None:
@@ -92,17 +113,6 @@ def get_watcher_args(port_forward_args, kubectl_global_flags=None):
             namespace = "default"
         debug.print(f"No namespace specified, using current context namespace: '{namespace}'")
 
-    # Find resource name (e.g., 'svc/frontend')
-    for arg in port_forward_args:
-        # Use regex to match patterns like 'svc/my-service' or 'pod/my-pod'
-        # We accept any resource type (characters, numbers, dashes, dots)
-        match = re.match(r"([a-z0-9.-]+)/(.+)", arg)
-        if match:
-            # The resource name is the second group in the regex match
-            resource_name = match.group(2)
-            debug.print(f"Found resource: {match.group(1)}/{resource_name}")
-            break
-
     if not resource_name:
         debug.print("ERROR: Could not determine resource name from args")
         console.print("Could not determine resource name for endpoint watcher.")
@@ -157,15 +167,17 @@ def run_port_forward(
         history_logger.finalize("kubectl_error")
         sys.exit(1)
 
-    # Validate service exists and has endpoints
-    if not validate_service_and_endpoints(port_forward_args, debug.print, kubectl_global_flags):
-        history_logger.finalize("service_error")
-        sys.exit(1)
-
     # Get watcher arguments from the port-forwarding args
     namespace, resource_name = get_watcher_args(port_forward_args, kubectl_global_flags)
     debug.print(f"Parsed namespace: {namespace}, resource_name: {resource_name}")
 
+    # Validate service exists and has endpoints (reusing the namespace resolved above)
+    if not validate_service_and_endpoints(
+        port_forward_args, debug.print, kubectl_global_flags, namespace=namespace
+    ):
+        history_logger.finalize("service_error")
+        sys.exit(1)
+
     debug.print(f"Port-forward arguments: {port_forward_args}")
     debug.print(f"Endpoint watcher target: namespace={namespace}, resource_name={resource_name}")
 
@@ -192,7 +204,8 @@ def run_port_forward(
         try:
             from .kubernetes import KubernetesClient
 
-            k8s = KubernetesClient()
+            # kubectl was already validated above, so skip the client's own probe
+            k8s = KubernetesClient(check_kubectl=False)
             context = k8s.get_current_context()
         except Exception:  # noqa: BLE001, S110
             pass
@@ -223,15 +236,20 @@ def run_port_forward(
         resource_name, namespace, context, kubeconfig, listen_all, local_port, remote_port
     )
 
+    # Without debug mode the threads get no callback at all, so their periodic
+    # debug messages skip the call into Debug.print entirely
+    debug_callback = debug.print if debug_mode else None
+
     # Create forwarder and watcher instances
     forwarder = PortForwarder(
         port_forward_args,
         shutdown_event,
         restart_event,
-        debug_callback=debug.print,
+        debug_callback=debug_callback,
         config=config,
         history_logger=history_logger,
         no_health_check=not run_http_health_checks,
+        context=context or None,
     )
 
     # define delegate method for watcher to check if it should trigger restart on forwarder
@@ -244,9 +262,10 @@ def run_port_forward(
         shutdown_event,
         restart_event,
         should_restart_delegate,
-        debug_callback=debug.print,
+        debug_callback=debug_callback,
         history_logger=history_logger,
         kubectl_global_flags=kubectl_global_flags,
+        debounce_seconds=(config.get("endpointDebounceMs", 500) if config else 500) / 1000,
     )
 
     # Create network watchdog if enabled
@@ -260,42 +279,49 @@ def run_port_forward(
             restart_event=restart_event,
             interval=watchdog_interval,
             failure_threshold=watchdog_threshold,
-            debug_callback=debug.print,
+            debug_callback=debug_callback,
             local_port=local_port,
             kubectl_global_flags=kubectl_global_flags,
+            api_server_cache=Path("~/.cache/kpf/api-server.json").expanduser(),
         )
         debug.print(
             f"Network watchdog enabled (interval={watchdog_interval}s, threshold={watchdog_threshold}, port={local_port})"
         )
 
+    # Register signal handler for graceful shutdown before any thread starts, so
+    # a Ctrl+C during startup can't orphan the kubectl children
+    signal.signal(signal.SIGINT, _signal_handler)
+
     debug.print("Starting threads")
     forwarder.start()
     watcher.start()
     if watchdog:
         watchdog.start()
 
-    # Register signal handler for graceful shutdown
-    signal.signal(signal.SIGINT, _signal_handler)
-
     try:
-        # Keep the main thread alive while the other threads are running
+        # Block until shutdown is requested. The forwarder and watcher threads set
+        # shutdown_event when they exit, and so does the SIGINT handler.
         while forwarder.is_alive() and watcher.is_alive() and not shutdown_event.is_set():
-            # Also check watchdog if enabled (daemon thread, so don't block on it)
-            if watchdog and not watchdog.is_alive():
-                debug.print("Network watchdog thread died unexpectedly")
-            time.sleep(0.5)  # Check more frequently for shutdown
-
-    except KeyboardInterrupt:
-        # This should be handled by signal handler now, but keep as fallback
-        debug.print("KeyboardInterrupt in main loop (fallback)")
-        shutdown_event.set()
-        history_logger.finalize("user_interrupt")
+            shutdown_event.wait()
+
+        if _sigint_count:
+            console.print("\n[yellow]Ctrl+C detected. Shutting down gracefully...[/yellow]")
+            console.print("[yellow]Press Ctrl+C again to force exit.[/yellow]")
+            debug.print("First SIGINT received, initiating graceful shutdown")
+
+        # Also check watchdog if enabled (daemon thread, so don't block on it)
+        if watchdog and not watchdog.is_alive():
+            debug.print("Network watchdog thread died unexpectedly")
 
     finally:
         # Signal a graceful shutdown
         debug.print("Setting shutdown event")
         shutdown_event.set()
 
+        # The watcher blocks reading kubectl's output; ending the watch process lets
+        # it see the shutdown now instead of at the next endpoint event
+        watcher.terminate_process()
+
         # Wait for threads to finish with timeout
         debug.print("Waiting for threads to finish...")
         forwarder.join(timeout=3)  # Give a bit more time for graceful shutdown
@@ -1,9 +1,34 @@
 """Network watchdog to detect zombie connections after laptop sleep/wake."""
 
+import contextlib
+import errno
+import json
+import os
+import selectors
 import socket
+import struct
+import sys
 import threading
+import time
 import urllib.parse
 from collections.abc import Callable
+from pathlib import Path
+
+# struct linger {l_onoff=1, l_linger=0}: close() resets the connection immediately
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+# How long a probe may take to connect, and how often it checks for shutdown meanwhile
+_PROBE_TIMEOUT_SECONDS = 2.0
+_PROBE_SHUTDOWN_POLL_SECONDS = 0.1
+# connect_ex() results meaning a non-blocking connect is still under way
+_CONNECT_PENDING = {errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", -1)}
+
+# Re-resolve the API server hostname at least this often to follow DNS changes
+_RESOLVE_TTL_SECONDS = 900
+
+# Linux socket tables and the hex state code they use for listening sockets
+_PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+_TCP_LISTEN = "0A"
 
 
 class NetworkWatchdog(threading.Thread):
@@ -23,6 +48,7 @@ class NetworkWatchdog(threading.Thread):
         debug_callback: Callable[[str], None] | None = None,
         local_port: int | None = None,
         kubectl_global_flags: list | None = None,
+        api_server_cache: Path | None = None,
     ):
         """Initialize the network watchdog.
 
@@ -34,6 +60,8 @@ class NetworkWatchdog(threading.Thread):
             debug_callback: Optional callback for debug output
             local_port: Local forwarded port to check (optional but recommended)
             kubectl_global_flags: Global kubectl flags like --context/--kubeconfig
+            api_server_cache: Optional file that remembers the API server URL across
+                runs, invalidated when the kubeconfig changes
         """
         super().__init__(daemon=True)
         self.shutdown_event = shutdown_event
@@ -46,6 +74,10 @@ class NetworkWatchdog(threading.Thread):
         self.consecutive_failures = 0
         self._api_server_host: str | None = None
         self._api_server_port: int = 443
+        # (family, sockaddr) of the API server; refreshed after a failure or the TTL
+        self._api_server_addr: tuple[int, tuple] | None = None
+        self._api_server_resolved_at = 0.0
+        self.api_server_cache = api_server_cache
 
     def _debug(self, message: str, rate_limit: bool = False):
         """Print debug message if callback is set."""
@@ -61,6 +93,12 @@ class NetworkWatchdog(threading.Thread):
         if self._api_server_host is not None:
             return self._api_server_host, self._api_server_port
 
+        signature = self._kubeconfig_signature()
+        server_url = self._read_cached_server_url(signature)
+        if server_url:
+            self._debug("Network watchdog: Using cached API server address")
+            return self._set_api_server_address(server_url)
+
         try:
             import subprocess
 
@@ -83,18 +121,109 @@ class NetworkWatchdog(threading.Thread):
             )
             server_url = result.stdout.strip()
             if server_url:
-                parsed = urllib.parse.urlparse(server_url)
-                self._api_server_host = parsed.hostname
-                self._api_server_port = parsed.port or 443
-                self._debug(
-                    f"Network watchdog: API server is {self._api_server_host}:{self._api_server_port}"
-                )
-                return self._api_server_host, self._api_server_port
+                address = self._set_api_server_address(server_url)
+                self._write_cached_server_url(signature, server_url)
+                return address
         except (OSError, ValueError, subprocess.SubprocessError) as e:
             self._debug(f"Network watchdog: Failed to get API server address: {e}")
 
         return None, 443
 
+    def _set_api_server_address(self, server_url: str) -> tuple[str | None, int]:
+        """Parse and remember the API server host and port from its URL."""
+        parsed = urllib.parse.urlparse(server_url)
+        self._api_server_host = parsed.hostname
+        self._api_server_port = parsed.port or 443
+        self._api_server_addr = None
+        self._debug(
+            f"Network watchdog: API server is {self._api_server_host}:{self._api_server_port}"
+        )
+        return self._api_server_host, self._api_server_port
+
+    def _kubeconfig_signature(self) -> list | None:
+        """Identify the kubeconfig state that `kubectl config view --minify` resolves.
+
+        Returns:
+            The global flags plus (path, mtime) of every kubeconfig file kubectl reads,
+            or None if a file can't be stat'ed (the cache is then bypassed).
+        """
+        paths = None
+        for i, flag in enumerate(self.kubectl_global_flags):
+            if flag == "--kubeconfig" and i + 1 < len(self.kubectl_global_flags):
+                paths = [self.kubectl_global_flags[i + 1]]
+                break
+        if paths is None:
+            env_kubeconfig = os.environ.get("KUBECONFIG", "")
+            paths = [p for p in env_kubeconfig.split(os.pathsep) if p] or ["~/.kube/config"]
+
+        try:
+            files = [
+                [str(path), path.stat().st_mtime_ns]
+                for path in (Path(p).expanduser() for p in paths)
+            ]
+        except OSError:
+            return None
+        return [list(self.kubectl_global_flags), files]
+
+    def _read_cached_server_url(self, signature: list | None) -> str | None:
+        """Return the cached API server URL if it was stored for this kubeconfig state."""
+        if self.api_server_cache is None or signature is None:
+            return None
+        try:
+            with open(self.api_server_cache) as f:
+                cached = json.load(f)
+        except OSError, ValueError:
+            return None
+        if not isinstance(cached, dict) or cached.get("signature") != signature:
+            return None
+        return cached.get("server") or None
+
+    def _write_cached_server_url(self, signature: list | None, server_url: str):
+        """Persist the API server URL for the current kubeconfig state."""
+        if self.api_server_cache is None or signature is None:
+            return
+        try:
+            self.api_server_cache.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.api_server_cache, "w") as f:
+                json.dump({"signature": signature, "server": server_url}, f)
+        except OSError as e:
+            self._debug(f"Network watchdog: Failed to cache API server address: {e}")
+
+    def _probe(self, address: tuple, family: int = socket.AF_INET) -> int:
+        """Open and immediately drop a TCP connection.
+
+        The socket lingers with a zero timeout so close() sends RST instead of FIN;
+        a probe every few seconds would otherwise leave a TIME_WAIT entry (and
+        hold an ephemeral port) for each check over a long session.
+
+        The connect is non-blocking so a slow probe gives up as soon as shutdown
+        is requested instead of holding the thread for the whole timeout.
+
+        Returns:
+            0 if connected, otherwise an errno
+
+        Raises:
+            TimeoutError: If the connection didn't complete in time or shutdown began
+        """
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            with contextlib.suppress(OSError):  # Best effort; the probe works without it
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+            sock.setblocking(False)
+            result = sock.connect_ex(address)
+            if result not in _CONNECT_PENDING:
+                return result
+
+            deadline = time.monotonic() + _PROBE_TIMEOUT_SECONDS
+            with selectors.DefaultSelector() as selector:
+                selector.register(sock, selectors.EVENT_WRITE)
+                while not selector.select(_PROBE_SHUTDOWN_POLL_SECONDS):
+                    if self.shutdown_event.is_set() or time.monotonic() >= deadline:
+                        raise TimeoutError(f"connect to {address[0]}:{address[1]} timed out")
+            return sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        finally:
+            sock.close()
+
     def check_api_connectivity(self) -> bool:
         """Check connectivity to K8s API server via TCP connection.
 
@@ -106,11 +235,26 @@ class NetworkWatchdog(threading.Thread):
             self._debug("Network watchdog: No API server address available", rate_limit=True)
             return True  # Assume OK if we can't determine the address
 
+        reachable = self._probe_api_server(host, port)
+        if not reachable:
+            # Resolve again on the next check in case the server moved
+            self._api_server_addr = None
+        return reachable
+
+    def _probe_api_server(self, host: str, port: int) -> bool:
+        """Probe the API server, resolving its hostname only when nothing is cached."""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2.0)
-            result = sock.connect_ex((host, port))
-            sock.close()
+            now = time.monotonic()
+            if (
+                self._api_server_addr is None
+                or now - self._api_server_resolved_at > _RESOLVE_TTL_SECONDS
+            ):
+                infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+                family, _, _, _, sockaddr = infos[0]
+                self._api_server_addr = (family, sockaddr)
+                self._api_server_resolved_at = now
+            family, sockaddr = self._api_server_addr
+            result = self._probe(sockaddr, family)
 
             if result == 0:
                 self._debug(
@@ -132,6 +276,38 @@ class NetworkWatchdog(threading.Thread):
             self._debug(f"Network watchdog: Connection error to {host}:{port}: {e}")
             return False
 
+    def _is_port_listening(self, port: int) -> bool | None:
+        """Look for a listening socket on the port in the Linux socket tables.
+
+        Reading /proc/net/tcp{,6} needs no connection, so kubectl isn't woken up
+        to accept and drop a probe on every check.
+
+        Returns:
+            True or False, or None when the tables aren't available (non-Linux)
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+
+        suffix = f":{port:04X}"
+        tables_read = False
+        for path in _PROC_NET_TCP:
+            try:
+                with open(path) as f:
+                    next(f, None)  # Column header
+                    for line in f:
+                        # sl local_address rem_address st ...
+                        fields = line.split()
+                        if (
+                            len(fields) > 3
+                            and fields[3] == _TCP_LISTEN
+                            and fields[1].endswith(suffix)
+                        ):
+                            return True
+            except OSError:
+                continue
+            tables_read = True
+        return False if tables_read else None
+
     def check_local_port(self) -> bool:
         """Check if the local forwarded port is accepting connections.
 
@@ -144,11 +320,19 @@ class NetworkWatchdog(threading.Thread):
         if self.local_port is None:
             return True  # Can't check without a port
 
+        listening = self._is_port_listening(self.local_port)
+        if listening is not None:
+            if listening:
+                self._debug(
+                    f"Network watchdog: Local port {self.local_port} is listening",
+                    rate_limit=True,
+                )
+            else:
+                self._debug(f"Network watchdog: Nothing listening on local port {self.local_port}")
+            return listening
+
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2.0)
-            result = sock.connect_ex(("localhost", self.local_port))
-            sock.close()
+            result = self._probe(("localhost", self.local_port))
 
             if result == 0:
                 self._debug(
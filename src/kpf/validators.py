@@ -1,14 +1,35 @@
+import json
 import os
+import re
 import socket
 import subprocess
 
-from .logger import console, debug
-
-
-def _debug_print(message, debug_enabled=False):
-    # Shim to maintain compatibility or redirect to new debug
-    if debug_enabled:
-        debug.print(message)
+from .logger import console
+
+# Resource type spellings kubectl port-forward accepts, mapped to their canonical name
+_RESOURCE_ALIASES = {
+    "svc": "service",
+    "services": "service",
+    "service": "service",
+    "po": "pod",
+    "pods": "pod",
+    "pod": "pod",
+    "deploy": "deployment",
+    "deployments": "deployment",
+    "deployment": "deployment",
+    "rs": "replicaset",
+    "replicasets": "replicaset",
+    "replicaset": "replicaset",
+    "sts": "statefulset",
+    "statefulsets": "statefulset",
+    "statefulset": "statefulset",
+    "ds": "daemonset",
+    "daemonsets": "daemonset",
+    "daemonset": "daemonset",
+}
+
+# Leading local port of a port mapping like '8080:80' (flags never start with a digit)
+_LOCAL_PORT_RE = re.compile(r"(\d+):")
 
 
 def extract_kubectl_global_flags(port_forward_args):
@@ -92,12 +113,9 @@ def validate_context(kubectl_global_flags):
 def extract_local_port(port_forward_args):
     """Extract local port from port-forward arguments like '8080:80' -> 8080."""
     for arg in port_forward_args:
-        if ":" in arg and not arg.startswith("-"):
-            try:
-                local_port_str, _ = arg.split(":", 1)
-                return int(local_port_str)
-            except ValueError, IndexError:
-                continue
+        match = _LOCAL_PORT_RE.match(arg)
+        if match:
+            return int(match.group(1))
     return None
 
 
@@ -110,6 +128,11 @@ def is_port_available(port: int) -> tuple[bool, str]:
     """
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if os.name != "nt":
+                # kubectl's listener sets SO_REUSEADDR, so TIME_WAIT connections left by
+                # a previous forward don't block it; probe with the same semantics.
+                # (On Windows the option would allow binding over an active listener.)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             sock.bind(("localhost", port))
             return True, ""
     except OSError as e:
@@ -216,28 +239,6 @@ def validate_kubectl_command(port_forward_args):
         # Basic validation of resource format (svc/name, pod/name, etc.)
         resource_found = False
 
-        # normalized resource types map
-        resource_aliases = {
-            "svc": "service",
-            "services": "service",
-            "service": "service",
-            "po": "pod",
-            "pods": "pod",
-            "pod": "pod",
-            "deploy": "deployment",
-            "deployments": "deployment",
-            "deployment": "deployment",
-            "rs": "replicaset",
-            "replicasets": "replicaset",
-            "replicaset": "replicaset",
-            "sts": "statefulset",
-            "statefulsets": "statefulset",
-            "statefulset": "statefulset",
-            "ds": "daemonset",
-            "daemonsets": "daemonset",
-            "daemonset": "daemonset",
-        }
-
         for arg in port_forward_args:
             if "/" in arg and not arg.startswith("-"):
                 resource_parts = arg.split("/", 1)
@@ -245,7 +246,7 @@ def validate_kubectl_command(port_forward_args):
                     resource_type = resource_parts[0].lower()
                     resource_name = resource_parts[1]
 
-                    if resource_type in resource_aliases and resource_name:
+                    if resource_type in _RESOURCE_ALIASES and resource_name:
                         resource_found = True
                         break
 
@@ -272,24 +273,27 @@ def validate_kubectl_command(port_forward_args):
 
 
 def validate_service_and_endpoints(
-    port_forward_args, debug_callback=None, kubectl_global_flags=None
+    port_forward_args, debug_callback=None, kubectl_global_flags=None, namespace=None
 ):
-    """Validate that the target service exists and has endpoints."""
+    """Validate that the target service exists and has endpoints.
+
+    Pass `namespace` when it is already resolved to skip looking it up again.
+    """
     if kubectl_global_flags is None:
         kubectl_global_flags = []
     try:
         # Extract namespace and resource info
-        namespace = None
         resource_type = None
         resource_name = None
 
         # Find namespace
-        try:
-            n_index = port_forward_args.index("-n")
-            if n_index + 1 < len(port_forward_args):
-                namespace = port_forward_args[n_index + 1]
-        except ValueError:
-            pass  # '-n' flag not found
+        if namespace is None:
+            try:
+                n_index = port_forward_args.index("-n")
+                if n_index + 1 < len(port_forward_args):
+                    namespace = port_forward_args[n_index + 1]
+            except ValueError:
+                pass  # '-n' flag not found
 
         # If namespace not found or incomplete, use current context namespace
         if namespace is None:
@@ -319,35 +323,15 @@ def validate_service_and_endpoints(
             return True  # Let kubectl handle it
 
         # Normalize resource type
-        resource_aliases = {
-            "svc": "service",
-            "services": "service",
-            "service": "service",
-            "po": "pod",
-            "pods": "pod",
-            "pod": "pod",
-            "deploy": "deployment",
-            "deployments": "deployment",
-            "deployment": "deployment",
-            "rs": "replicaset",
-            "replicasets": "replicaset",
-            "replicaset": "replicaset",
-            "sts": "statefulset",
-            "statefulsets": "statefulset",
-            "statefulset": "statefulset",
-            "ds": "daemonset",
-            "daemonsets": "daemonset",
-            "daemonset": "daemonset",
-        }
-
-        normalized_type = resource_aliases.get(resource_type, resource_type)
+        normalized_type = _RESOURCE_ALIASES.get(resource_type, resource_type)
 
         if debug_callback:
             debug_callback(f"Validating {normalized_type}/{resource_name} in namespace {namespace}")
 
         # For services, check if service exists and has endpoints
         if normalized_type == "service":
-            # Check if service exists
+            # Fetch the service and its endpoints with a single kubectl call. If only
+            # one of them exists kubectl still prints it, but exits non-zero.
             cmd_service = (
                 [
                     "kubectl",
@@ -355,8 +339,8 @@ def validate_service_and_endpoints(
                 + kubectl_global_flags
                 + [
                     "get",
-                    "svc",
-                    resource_name,
+                    f"svc/{resource_name}",
+                    f"endpoints/{resource_name}",
                     "-n",
                     namespace,
                     "-o",
@@ -367,7 +351,22 @@ def validate_service_and_endpoints(
                 cmd_service, capture_output=True, text=True, timeout=10, check=False
             )
 
-            if result.returncode != 0:
+            objects = {}
+            try:
+                data = json.loads(result.stdout) if result.stdout.strip() else {}
+                items = data.get("items", []) if data.get("kind") == "List" else [data]
+                objects = {item.get("kind"): item for item in items}
+            except (json.JSONDecodeError, AttributeError, TypeError) as e:
+                if debug_callback:
+                    debug_callback(f"Failed to parse service JSON: {e}")
+                if result.returncode == 0:
+                    console.print(
+                        "[yellow]Warning: Could not validate endpoints, proceeding anyway[/yellow]"
+                    )
+                    return True
+
+            service_data = objects.get("Service")
+            if service_data is None:
                 error_msg = result.stderr.strip() if result.stderr else "Unknown error"
                 console.print(
                     f"[red]Error: Service '{resource_name}' not found in namespace '{namespace}'[/red]"
@@ -383,42 +382,16 @@ def validate_service_and_endpoints(
             if debug_callback:
                 debug_callback(f"Service {resource_name} exists")
 
-            # Parse service data to extract selector for later use
+            # Extract the selector to suggest a pod query below
             service_selector_str = "<service-selector>"
-            try:
-                import json
-
-                service_data = json.loads(result.stdout)
-                selector = service_data.get("spec", {}).get("selector", {})
-                if selector:
-                    # Format selector as key=value,key=value
-                    parts = [f"{k}={v}" for k, v in selector.items()]
-                    service_selector_str = ",".join(parts)
-            except (json.JSONDecodeError, KeyError) as e:
-                if debug_callback:
-                    debug_callback(f"Failed to parse service JSON: {e}")
-
-            # Check if service has endpoints
-            cmd_endpoints = (
-                [
-                    "kubectl",
-                ]
-                + kubectl_global_flags
-                + [
-                    "get",
-                    "endpoints",
-                    resource_name,
-                    "-n",
-                    namespace,
-                    "-o",
-                    "json",
-                ]
-            )
-            result = subprocess.run(
-                cmd_endpoints, capture_output=True, text=True, timeout=10, check=False
-            )
-
-            if result.returncode != 0:
+            selector = service_data.get("spec", {}).get("selector", {})
+            if selector:
+                # Format selector as key=value,key=value
+                parts = [f"{k}={v}" for k, v in selector.items()]
+                service_selector_str = ",".join(parts)
+
+            endpoints_data = objects.get("Endpoints")
+            if endpoints_data is None:
                 console.print(f"[red]Error: No endpoints found for service '{resource_name}'[/red]")
                 console.print(
                     "[yellow]This usually means no pods are running for this service[/yellow]"
@@ -430,41 +403,23 @@ def validate_service_and_endpoints(
                 )
                 return False
 
-            # Parse endpoints to see if any exist
-            try:
-                import json
-
-                endpoints_data = json.loads(result.stdout)
-                subsets = endpoints_data.get("subsets", [])
-
-                has_ready_endpoints = False
-                for subset in subsets:
-                    addresses = subset.get("addresses", [])
-                    if addresses:
-                        has_ready_endpoints = True
-                        break
-
-                if not has_ready_endpoints:
-                    console.print(
-                        f"[red]Error: Service '{resource_name}' has no ready endpoints[/red]"
-                    )
-                    console.print(
-                        "[yellow]This means the service exists but no pods are ready to serve traffic[/yellow]"
-                    )
-                    console.print(
-                        f"[yellow]Check pod status: kubectl get pods -n {namespace} -l {service_selector_str}[/yellow]"
-                    )
-                    return False
-
-                if debug_callback:
-                    debug_callback(f"Service {resource_name} has ready endpoints")
+            # Check whether any endpoint address is ready
+            has_ready_endpoints = any(
+                subset.get("addresses") for subset in endpoints_data.get("subsets") or []
+            )
 
-            except (json.JSONDecodeError, KeyError) as e:
-                if debug_callback:
-                    debug_callback(f"Failed to parse endpoints JSON: {e}")
+            if not has_ready_endpoints:
+                console.print(f"[red]Error: Service '{resource_name}' has no ready endpoints[/red]")
+                console.print(
+                    "[yellow]This means the service exists but no pods are ready to serve traffic[/yellow]"
+                )
                 console.print(
-                    "[yellow]Warning: Could not validate endpoints, proceeding anyway[/yellow]"
+                    f"[yellow]Check pod status: kubectl get pods -n {namespace} -l {service_selector_str}[/yellow]"
                 )
+                return False
+
+            if debug_callback:
+                debug_callback(f"Service {resource_name} has ready endpoints")
 
         # For other resources, check if they exist (simpler check)
         elif normalized_type in ["pod", "deployment", "replicaset", "statefulset", "daemonset"]:
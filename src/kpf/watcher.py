@@ -1,11 +1,16 @@
 import subprocess
 import threading
-import time
 
 from rich.console import Console
 
 console = Console()
 
+# Prints each ready endpoint IP on its own line, then a delimiter, for every watch event
+SNAPSHOT_DELIMITER = "---"
+ENDPOINT_IPS_JSONPATH = (
+    'jsonpath={range .subsets[*].addresses[*]}{.ip}{"\\n"}{end}{"' + SNAPSHOT_DELIMITER + '\\n"}'
+)
+
 
 class EndpointWatcher:
     def __init__(
@@ -18,6 +23,7 @@ class EndpointWatcher:
         debug_callback=None,
         history_logger=None,
         kubectl_global_flags=None,
+        debounce_seconds=0,
     ):
         self.namespace = namespace
         self.resource_name = resource_name
@@ -29,13 +35,23 @@ class EndpointWatcher:
         self.debug_print = debug_callback if debug_callback else lambda msg, rate_limit=False: None
         self.history_logger = history_logger
         self.kubectl_global_flags = kubectl_global_flags or []
+        self.debounce_seconds = debounce_seconds
+        self._debounce_timer = None
+        self.proc = None
         self.thread = None
 
     def start(self):
         """Start the watcher thread."""
-        self.thread = threading.Thread(target=self.endpoint_watcher_thread)
+        self.thread = threading.Thread(target=self._run)
         self.thread.start()
 
+    def _run(self):
+        """Thread entry point; always signals shutdown when the thread exits."""
+        try:
+            self.endpoint_watcher_thread()
+        finally:
+            self.shutdown_event.set()
+
     def is_alive(self):
         return self.thread and self.thread.is_alive()
 
@@ -52,6 +68,10 @@ class EndpointWatcher:
             f"Endpoint watcher thread started for {self.namespace}/{self.resource_name}"
         )
 
+        # Ready endpoint IPs from the last snapshot; kept across kubectl reconnects so a
+        # change that happened while the watch was down is still detected
+        prev_ips = None
+
         while not self.shutdown_event.is_set():
             try:
                 self.debug_print(
@@ -64,12 +84,13 @@ class EndpointWatcher:
                     + self.kubectl_global_flags
                     + [
                         "get",
-                        "--no-headers",
                         "ep",
                         "-w",
                         "-n",
                         self.namespace,
                         self.resource_name,
+                        "-o",
+                        ENDPOINT_IPS_JSONPATH,
                     ]
                 )
                 self.debug_print(
@@ -77,49 +98,55 @@ class EndpointWatcher:
                     rate_limit=True,
                 )
 
-                self.proc = subprocess.Popen(
+                # Keep a local reference: terminate_process() may clear self.proc from
+                # another thread to unblock the read below during shutdown
+                proc = self.proc = subprocess.Popen(
                     command,
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,  # Never read; a pipe could fill and block kubectl
                     universal_newlines=True,
                 )
-                self.debug_print(f"Endpoint watcher process started with PID: {self.proc.pid}")
+                self.debug_print(f"Endpoint watcher process started with PID: {proc.pid}")
 
                 # The `for` loop will block and yield lines as they are produced
-                # by the subprocess's stdout.
-                is_first_line = True
-                for line in self.proc.stdout:
+                # by the subprocess's stdout. Each watch event prints one IP per
+                # line followed by a snapshot delimiter.
+                ips = []
+                for line in proc.stdout:
                     if self.shutdown_event.is_set():
                         self.debug_print("Shutdown event detected in endpoint watcher, breaking")
                         break
+                    line = line.strip()
+                    if line != SNAPSHOT_DELIMITER:
+                        if line:
+                            ips.append(line)
+                        continue
+
+                    new_ips = frozenset(ips)
+                    ips = []
                     self.debug_print(
-                        f"Endpoint watcher received line: {line.strip()}", rate_limit=True
+                        f"Endpoint watcher received addresses: {sorted(new_ips)}", rate_limit=True
                     )
-                    # The first line is the table header, which we should ignore.
-                    if is_first_line:
-                        is_first_line = False
-                        self.debug_print("Skipping first line (header)")
+
+                    # The first snapshot is the current state, not a change
+                    if prev_ips is None:
+                        prev_ips = new_ips
+                        self.debug_print("Recorded initial endpoint addresses")
+                        continue
+                    if new_ips == prev_ips:
+                        self.debug_print("Endpoint update without address change, ignoring")
                         continue
-                    else:
-                        self.debug_print("Endpoint change detected")
-                        self.debug_print(f"Endpoint change details: {line.strip()}")
-
-                        # Check if we should restart (throttling)
-                        if self.delegate_should_restart():
-                            console.print(
-                                "[green][Watcher] Endpoint change detected, restarting port-forward...[/green]"
-                            )
-                            if self.history_logger:
-                                self.history_logger.increment_endpoint_changes()
-                            self.restart_event.set()
-                        else:
-                            self.debug_print(
-                                "[Watcher] Endpoint change detected, but restart throttled"
-                            )
+
+                    self.debug_print("Endpoint change detected")
+                    self.debug_print(
+                        f"Endpoint change details: {sorted(prev_ips)} -> {sorted(new_ips)}"
+                    )
+                    prev_ips = new_ips
+                    self._schedule_restart()
 
                 # If the subprocess finishes, we should break out and restart the watcher
                 # This handles cases where the kubectl process itself might terminate.
-                self.proc.wait()
+                proc.wait()
 
                 # Add delay before restarting to prevent rapid kubectl process creation
                 if not self.shutdown_event.is_set():
@@ -127,7 +154,7 @@ class EndpointWatcher:
                         "Endpoint watcher kubectl process ended, waiting 2s before restart",
                         rate_limit=True,
                     )
-                    time.sleep(2)
+                    self.shutdown_event.wait(2)
 
             except Exception as e:  # noqa: BLE001
                 console.print(f"[red][Watcher] An error occurred: {e}[/red]")
@@ -140,9 +167,43 @@ class EndpointWatcher:
                     self.debug_print("Final cleanup: terminating endpoint watcher process")
                     self.terminate_process()
 
+    def _schedule_restart(self):
+        """Restart once the endpoints stop changing for `debounce_seconds`.
+
+        A rolling deployment emits a burst of changes; each one pushes the
+        restart back so the whole burst costs a single port-forward restart.
+        """
+        if self._debounce_timer:
+            self._debounce_timer.cancel()
+        if self.debounce_seconds <= 0:
+            self._trigger_restart()
+            return
+        self.debug_print(f"Restart scheduled in {self.debounce_seconds}s unless endpoints change")
+        self._debounce_timer = threading.Timer(self.debounce_seconds, self._trigger_restart)
+        self._debounce_timer.daemon = True
+        self._debounce_timer.start()
+
+    def _trigger_restart(self):
+        """Ask the port-forwarder to restart after an endpoint change."""
+        if self.shutdown_event.is_set():
+            return
+
+        # Check if we should restart (throttling)
+        if self.delegate_should_restart():
+            console.print(
+                "[green][Watcher] Endpoint change detected, restarting port-forward...[/green]"
+            )
+            if self.history_logger:
+                self.history_logger.increment_endpoint_changes()
+            self.restart_event.set()
+        else:
+            self.debug_print("[Watcher] Endpoint change detected, but restart throttled")
+
     def terminate_process(self):
         """Terminate the endpoint watcher process safely."""
-        if hasattr(self, "proc") and self.proc:
+        if self._debounce_timer:
+            self._debounce_timer.cancel()
+        if self.proc:
             self.debug_print(f"Terminating endpoint watcher process PID: {self.proc.pid}")
             self._kill_proc(self.proc)
             self.proc = None
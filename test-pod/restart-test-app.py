@@ -8,51 +8,34 @@ Perfect for testing kubectl port-forward functionality with kpf.
 import json
 import time
 from datetime import UTC, datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse
 
-# Track when the container started
-START_TIME = time.time()
+# Track when the container started (monotonic, so uptime survives clock changes)
+START_TIME = time.monotonic()
 START_DATETIME = datetime.now(UTC)
 
+# /health is polled constantly and only its uptime changes, so just that is formatted
+_HEALTH_PREFIX = b'{"status": "healthy", "uptime_seconds": '
 
-class UptimeHandler(BaseHTTPRequestHandler):
-    """HTTP request handler that serves uptime information."""
+# Last formatted wall-clock string per format, as {format: (epoch_second, text)}
+_time_strings: dict[str | None, tuple[int, str]] = {}
 
-    def do_GET(self):
-        """Handle GET requests."""
-        path = urlparse(self.path).path
-        # query_params = parse_qs(urlparse(self.path).query)
 
-        # Calculate uptime
-        current_time = time.time()
-        uptime_seconds = int(current_time - START_TIME)
-
-        # Prepare response data
-        response_data = {
-            "uptime_seconds": uptime_seconds,
-            "uptime_human": self._format_uptime(uptime_seconds),
-            "started_at": START_DATETIME.isoformat(),
-            "current_time": datetime.now(UTC).isoformat(),
-            "container_name": "kpf-test-app",
-            "version": "1.0.0",
-        }
+def _utc_now(fmt: str | None = None) -> str:
+    """Format the current UTC time (ISO 8601 by default), at most once per second."""
+    now_s = int(time.time())
+    cached = _time_strings.get(fmt)
+    if cached is None or cached[0] != now_s:
+        now = datetime.fromtimestamp(now_s, UTC)
+        cached = (now_s, now.isoformat() if fmt is None else now.strftime(fmt))
+        _time_strings[fmt] = cached
+    return cached[1]
 
-        # Handle different endpoints
-        if path == "/":
-            self._serve_html(response_data)
-        elif path == "/health":
-            self._serve_json({"status": "healthy", "uptime_seconds": uptime_seconds})
-        elif path == "/metrics":
-            self._serve_metrics(uptime_seconds)
-        elif path == "/api/uptime":
-            self._serve_json(response_data)
-        else:
-            self._serve_404()
 
-    def _serve_html(self, data):
-        """Serve HTML response for the root endpoint."""
-        html = f"""
+# The root page only depends on the start time, so it is rendered once; the
+# script fetches /api/uptime immediately and every second after that
+_HTML_BYTES = f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -133,19 +116,19 @@ class UptimeHandler(BaseHTTPRequestHandler):
         <h1>kpf Test Application</h1>
 
         <div id="uptime-display">
-            <div class="uptime">Uptime: {data["uptime_human"]}</div>
+            <div class="uptime loading">Loading uptime...</div>
         </div>
 
         <div id="status-display">
-            <div class="status">✅ Connected - Initial load</div>
+            <div class="status">🔄 Connecting...</div>
         </div>
 
         <div id="details-display">
             <div class="details">
                 <h3>Container Details:</h3>
-                <p><strong>Started:</strong> {data["started_at"]}</p>
-                <p><strong>Current Time:</strong> {data["current_time"]}</p>
-                <p><strong>Uptime (seconds):</strong> {data["uptime_seconds"]}</p>
+                <p><strong>Started:</strong> {START_DATETIME.isoformat()}</p>
+                <p><strong>Current Time:</strong> <span class="loading">Loading...</span></p>
+                <p><strong>Uptime (seconds):</strong> <span class="loading">Loading...</span></p>
             </div>
         </div>
 
@@ -163,36 +146,83 @@ class UptimeHandler(BaseHTTPRequestHandler):
     </div>
 </body>
 </html>
-        """
+        """.encode()
+
+
+class UptimeHandler(BaseHTTPRequestHandler):
+    """HTTP request handler that serves uptime information."""
+
+    # Send small responses right away instead of waiting on Nagle's algorithm
+    disable_nagle_algorithm = True
+    # Keep connections open between the page's once-a-second polls; every response
+    # must therefore carry a Content-Length. Idle connections are dropped after 30s.
+    protocol_version = "HTTP/1.1"
+    timeout = 30
+
+    def do_GET(self):
+        """Handle GET requests."""
+        path = urlparse(self.path).path
+        # query_params = parse_qs(urlparse(self.path).query)
+
+        # Calculate uptime
+        uptime_seconds = int(time.monotonic() - START_TIME)
+
+        # Handle different endpoints
+        if path == "/":
+            self._serve_html()
+        elif path == "/health":
+            self._serve_json(_HEALTH_PREFIX + str(uptime_seconds).encode() + b"}")
+        elif path == "/metrics":
+            self._serve_metrics(uptime_seconds)
+        elif path == "/api/uptime":
+            response_data = {
+                "uptime_seconds": uptime_seconds,
+                "uptime_human": self._format_uptime(uptime_seconds),
+                "started_at": START_DATETIME.isoformat(),
+                "current_time": _utc_now(),
+                "container_name": "kpf-test-app",
+                "version": "1.0.0",
+            }
+            self._serve_json(json.dumps(response_data).encode())
+        else:
+            self._serve_404()
+
+    def _serve_html(self):
+        """Serve the root page; its live values are filled in by the page's script."""
         self.send_response(200)
         self.send_header("Content-type", "text/html")
+        self.send_header("Content-Length", str(len(_HTML_BYTES)))
         self.end_headers()
-        self.wfile.write(html.encode())
+        self.wfile.write(_HTML_BYTES)
 
-    def _serve_json(self, data):
-        """Serve JSON response."""
+    def _serve_json(self, body):
+        """Serve an already-encoded JSON response."""
         self.send_response(200)
         self.send_header("Content-type", "application/json")
         self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode())
+        self.wfile.write(body)
 
     def _serve_metrics(self, uptime_seconds):
         """Serve Prometheus-style metrics."""
         metrics = f"""# TYPE app_uptime_seconds counter
 app_uptime_seconds {uptime_seconds}
-"""
+""".encode()
         self.send_response(200)
         self.send_header("Content-type", "text/plain")
+        self.send_header("Content-Length", str(len(metrics)))
         self.end_headers()
-        self.wfile.write(metrics.encode())
+        self.wfile.write(metrics)
 
     def _serve_404(self):
         """Serve 404 response."""
+        body = b"404 Not Found"
         self.send_response(404)
         self.send_header("Content-type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(b"404 Not Found")
+        self.wfile.write(body)
 
     def _format_uptime(self, seconds):
         """Format uptime in human-readable format."""
@@ -210,14 +240,15 @@ app_uptime_seconds {uptime_seconds}
 
     def log_message(self, format, *args):
         """Log requests with timestamp."""
-        timestamp = datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S UTC")
+        timestamp = _utc_now("%Y-%m-%d %H:%M:%S UTC")
         print(f"[{timestamp}] {format % args}")
 
 
 def main():
     """Main function to start the HTTP server."""
     port = 8080
-    server = HTTPServer(("", port), UptimeHandler)
+    # One thread per connection so a slow client can't stall everyone's polling
+    server = ThreadingHTTPServer(("", port), UptimeHandler)
 
     print("🚀 KPF Test App starting...")
     print(f"📊 Server listening on port {port}")
@@ -1,10 +1,23 @@
 """Pytest configuration and fixtures."""
 
-from unittest.mock import Mock
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 import pytest
 
 from src.kpf.kubernetes import KubernetesClient, ServiceInfo
+from src.kpf.main import restart_event, shutdown_event
+
+
+@pytest.fixture(autouse=True)
+def _reset_events():
+    """Start and finish every test with kpf's shared threading events cleared."""
+    shutdown_event.clear()
+    restart_event.clear()
+    yield
+    shutdown_event.clear()
+    restart_event.clear()
 
 
 @pytest.fixture
@@ -64,3 +77,37 @@ def mock_subprocess():
         mock_result.returncode = 0
         mock_run.return_value = mock_result
         yield mock_run
+
+
+@pytest.fixture
+def mocked_main(_reset_events):
+    """Patch run_port_forward's collaborators so it starts and exits immediately.
+
+    Validations pass, the target is default/test-service, and the forwarder,
+    watcher and watchdog are mocks whose threads report not alive. Tests adjust
+    the yielded mocks as needed before calling run_port_forward.
+    """
+    with ExitStack() as stack:
+        mocks = SimpleNamespace(
+            **{
+                name: stack.enter_context(patch(f"src.kpf.main.{target}"))
+                for name, target in [
+                    ("get_watcher_args", "get_watcher_args"),
+                    ("validate_port_format", "validate_port_format"),
+                    ("validate_port_availability", "validate_port_availability"),
+                    ("validate_kubectl_command", "validate_kubectl_command"),
+                    ("validate_service", "validate_service_and_endpoints"),
+                    ("forwarder", "PortForwarder"),
+                    ("watcher", "EndpointWatcher"),
+                    ("watchdog", "NetworkWatchdog"),
+                ]
+            }
+        )
+        mocks.get_watcher_args.return_value = ("default", "test-service")
+        mocks.validate_port_format.return_value = True
+        mocks.validate_port_availability.return_value = True
+        mocks.validate_kubectl_command.return_value = True
+        mocks.validate_service.return_value = True
+        for cls in (mocks.forwarder, mocks.watcher, mocks.watchdog):
+            cls.return_value.is_alive.return_value = False
+        yield mocks
@@ -16,6 +16,10 @@ class TestArgumentParser:
         assert parser.prog == "kpf"
         assert "kubectl port-forward" in parser.description.lower()
 
+    def test_create_parser_is_cached(self):
+        """Test the parser is only built once per process."""
+        assert create_parser() is create_parser()
+
     def test_parser_version_argument(self):
         """Test --version argument."""
         parser = create_parser()
@@ -1,5 +1,6 @@
 """Tests to ensure shell completions stay in sync with CLI arguments."""
 
+import functools
 import re
 from pathlib import Path
 
@@ -10,130 +11,90 @@ from kpf.cli import create_parser
 # Path to completions directory
 COMPLETIONS_DIR = Path(__file__).parent.parent / "src" / "kpf" / "completions"
 
+# Flag list passed to compgen in the Bash completion script
+_BASH_FLAGS_RE = re.compile(r'compgen -W "([^"]+)"')
+
+# Flag specs in the Zsh completion script, one alternative per form:
+#   '(-n --namespace)'{-n,--namespace}  grouped flags (flags taken from the braces)
+#   '(-0)-0[...]'                       special flags
+#   '--auto-reconnect[...]'             standalone flags
+_ZSH_FLAGS_RE = re.compile(
+    r"'\([^)]+\)'\{([^}]+)\}"
+    r"|'\([^)]+\)(-\d+)\["
+    r"|'(--[a-z-]+)\["
+)
 
-def extract_cli_flags():
-    """Extract all flags from the CLI parser."""
-    parser = create_parser()
-    flags = set()
 
-    for action in parser._actions:
-        if action.option_strings:
-            for opt in action.option_strings:
-                flags.add(opt)
+@functools.cache
+def read_completion(name):
+    """Read a completion script once per test session."""
+    return (COMPLETIONS_DIR / name).read_text()
 
-    return flags
 
+@functools.cache
+def extract_cli_flags():
+    """Extract all flags from the CLI parser."""
+    # argparse already indexes every option string of every action
+    return frozenset(create_parser()._option_string_actions)
 
+
+@functools.cache
 def extract_bash_completion_flags():
     """Extract flags from the Bash completion script."""
-    completion_file = COMPLETIONS_DIR / "kpf.bash"
-    content = completion_file.read_text()
+    content = read_completion("kpf.bash")
 
     # Find the line with flag completions
-    match = re.search(r'compgen -W "([^"]+)"', content)
+    match = _BASH_FLAGS_RE.search(content)
     if not match:
-        return set()
+        return frozenset()
 
     flags_str = match.group(1)
-    return set(flags_str.split())
+    return frozenset(flags_str.split())
 
 
+@functools.cache
 def extract_zsh_completion_flags():
     """Extract flags from the Zsh completion script."""
-    completion_file = COMPLETIONS_DIR / "_kpf"
-    content = completion_file.read_text()
+    content = read_completion("_kpf")
 
     flags = set()
+    for match in _ZSH_FLAGS_RE.finditer(content):
+        # Exactly one alternative matched; its flags are in the last group it set
+        flags_group = match.group(match.lastindex)
 
-    # Match patterns like '(-n --namespace)'{-n,--namespace}
-    # or '(-0)-0[...]' for special flags
-    # or '--flag[...]' for standalone flags
-    patterns = [
-        r"'\(([^)]+)\)'\{([^}]+)\}",  # Grouped flags like (-n --namespace)'{-n,--namespace}
-        r"'\([^)]+\)(-\d+)\[",  # Special flags like '(-0)-0[...]'
-        r"'(--[a-z-]+)\[",  # Standalone flags like '--auto-reconnect[...]'
-    ]
-
-    for pattern in patterns:
-        matches = re.finditer(pattern, content)
-        for match in matches:
-            if len(match.groups()) > 1 and match.group(2):
-                # For grouped flags, extract from the braces
-                flags_group = match.group(2)
-            else:
-                flags_group = match.group(1)
-
-            # Split by comma or space to get individual flags
-            for flag in flags_group.replace(",", " ").split():
-                flags.add(flag)
+        # Split by comma or space to get individual flags
+        for flag in flags_group.replace(",", " ").split():
+            flags.add(flag)
 
     # Zsh's _arguments automatically provides -h/--help, add them for comparison
     flags.add("-h")
     flags.add("--help")
 
-    return flags
-
-
-def normalize_flags(flags):
-    """Normalize flags for comparison (handle -h, --help special cases)."""
-    # argparse adds -h/--help automatically, so we should include them
-    normalized = set(flags)
-    return normalized
+    return frozenset(flags)
 
 
 class TestCompletionSync:
     """Test that completion scripts are in sync with CLI."""
 
-    def test_bash_completion_has_all_flags(self):
-        """Verify Bash completion includes all CLI flags."""
-        cli_flags = extract_cli_flags()
-        bash_flags = extract_bash_completion_flags()
-
-        # Normalize both sets
-        cli_flags = normalize_flags(cli_flags)
-        bash_flags = normalize_flags(bash_flags)
-
-        missing_flags = cli_flags - bash_flags
-        assert not missing_flags, f"Bash completion is missing flags: {sorted(missing_flags)}"
-
-    def test_zsh_completion_has_all_flags(self):
-        """Verify Zsh completion includes all CLI flags."""
+    @pytest.mark.parametrize(
+        "shell,extract_flags",
+        [("Bash", extract_bash_completion_flags), ("Zsh", extract_zsh_completion_flags)],
+    )
+    def test_completion_flags_match_cli(self, shell, extract_flags):
+        """Verify a completion script offers exactly the CLI's flags."""
         cli_flags = extract_cli_flags()
-        zsh_flags = extract_zsh_completion_flags()
-
-        # Normalize both sets
-        cli_flags = normalize_flags(cli_flags)
-        zsh_flags = normalize_flags(zsh_flags)
+        shell_flags = extract_flags()
 
-        missing_flags = cli_flags - zsh_flags
-        assert not missing_flags, f"Zsh completion is missing flags: {sorted(missing_flags)}"
-
-    def test_no_extra_flags_in_bash(self):
-        """Verify Bash completion doesn't have extra flags not in CLI."""
-        cli_flags = extract_cli_flags()
-        bash_flags = extract_bash_completion_flags()
-
-        cli_flags = normalize_flags(cli_flags)
-        bash_flags = normalize_flags(bash_flags)
-
-        extra_flags = bash_flags - cli_flags
-        assert not extra_flags, f"Bash completion has extra flags: {sorted(extra_flags)}"
-
-    def test_no_extra_flags_in_zsh(self):
-        """Verify Zsh completion doesn't have extra flags not in CLI."""
-        cli_flags = extract_cli_flags()
-        zsh_flags = extract_zsh_completion_flags()
-
-        cli_flags = normalize_flags(cli_flags)
-        zsh_flags = normalize_flags(zsh_flags)
-
-        extra_flags = zsh_flags - cli_flags
-        assert not extra_flags, f"Zsh completion has extra flags: {sorted(extra_flags)}"
+        missing_flags = cli_flags - shell_flags
+        extra_flags = shell_flags - cli_flags
+        assert not missing_flags and not extra_flags, (
+            f"{shell} completion is missing flags: {sorted(missing_flags)}, "
+            f"has extra flags: {sorted(extra_flags)}"
+        )
 
     def test_bash_has_namespace_completion(self):
         """Verify Bash completion handles namespace flag."""
-        completion_file = COMPLETIONS_DIR / "kpf.bash"
-        content = completion_file.read_text()
+        content = read_completion("kpf.bash")
 
         # Check for namespace handling
         assert "-n|--namespace" in content, "Bash completion missing namespace handling"
@@ -143,8 +104,7 @@ class TestCompletionSync:
 
     def test_zsh_has_namespace_completion(self):
         """Verify Zsh completion handles namespace flag."""
-        completion_file = COMPLETIONS_DIR / "_kpf"
-        content = completion_file.read_text()
+        content = read_completion("_kpf")
 
         # Check for namespace handling
         assert "_kpf_namespaces" in content, "Zsh completion missing namespace function"
@@ -154,16 +114,14 @@ class TestCompletionSync:
 
     def test_bash_has_service_completion(self):
         """Verify Bash completion has service completion logic."""
-        completion_file = COMPLETIONS_DIR / "kpf.bash"
-        content = completion_file.read_text()
+        content = read_completion("kpf.bash")
 
         assert "kubectl get services" in content, "Bash completion missing service completion"
         assert "svc/" in content, "Bash completion should prefix services with 'svc/'"
 
     def test_zsh_has_service_completion(self):
         """Verify Zsh completion has service completion logic (via kubectl delegation)."""
-        completion_file = COMPLETIONS_DIR / "_kpf"
-        content = completion_file.read_text()
+        content = read_completion("_kpf")
 
         # Zsh completion delegates to _kubectl for service/port completion
         assert "_kubectl" in content, (
@@ -175,8 +133,7 @@ class TestCompletionSync:
 
     def test_bash_has_port_completion(self):
         """Verify Bash completion has port completion logic."""
-        completion_file = COMPLETIONS_DIR / "kpf.bash"
-        content = completion_file.read_text()
+        content = read_completion("kpf.bash")
 
         assert "kubectl get service" in content, "Bash completion missing port lookup"
         # Check for port:port format in completions
@@ -184,8 +141,7 @@ class TestCompletionSync:
 
     def test_zsh_has_port_completion(self):
         """Verify Zsh completion has port completion logic (via kubectl delegation)."""
-        completion_file = COMPLETIONS_DIR / "_kpf"
-        content = completion_file.read_text()
+        content = read_completion("_kpf")
 
         # Zsh completion delegates to _kubectl for port completion
         assert "_kubectl" in content, (
@@ -195,11 +151,8 @@ class TestCompletionSync:
 
     def test_completions_use_correct_jsonpath(self):
         """Verify completions use the correct jsonpath format (with range)."""
-        bash_file = COMPLETIONS_DIR / "kpf.bash"
-        zsh_file = COMPLETIONS_DIR / "_kpf"
-
-        bash_content = bash_file.read_text()
-        zsh_content = zsh_file.read_text()
+        bash_content = read_completion("kpf.bash")
+        zsh_content = read_completion("_kpf")
 
         # Check for the correct jsonpath pattern with range
         assert "{range .items[*]}" in bash_content, (
@@ -221,12 +174,9 @@ class TestCompletionSync:
 class TestCompletionFunctionality:
     """Test the actual functionality of completions."""
 
-    def test_cli_parser_accepts_all_flags(self):
-        """Verify the CLI parser can handle all defined flags."""
-        parser = create_parser()
-
-        # Test combinations of flags
-        test_cases = [
+    @pytest.mark.parametrize(
+        "test_args",
+        [
             ["-n", "default"],
             ["--namespace", "kube-system"],
             ["-A"],
@@ -243,19 +193,23 @@ class TestCompletionFunctionality:
             ["-p"],
             ["--prompt-namespace"],
             ["-v"],  # This will trigger version and exit, but should parse
-        ]
-
-        for test_args in test_cases:
-            try:
-                # Use parse_known_args to avoid SystemExit on -v/--version
-                _args, _ = parser.parse_known_args(test_args)
-                # If we got here, parsing succeeded
-            except SystemExit as e:
-                # Version flag causes SystemExit(0), which is expected
-                if "-v" in test_args or "--version" in test_args:
-                    assert e.code == 0
-                else:
-                    raise
+        ],
+    )
+    def test_cli_parser_accepts_all_flags(self, test_args):
+        """Verify the CLI parser can handle each defined flag."""
+        # create_parser() hands back the same parser every time
+        parser = create_parser()
+
+        try:
+            # Use parse_known_args to avoid SystemExit on -v/--version
+            _args, _ = parser.parse_known_args(test_args)
+            # If we got here, parsing succeeded
+        except SystemExit as e:
+            # Version flag causes SystemExit(0), which is expected
+            if "-v" in test_args or "--version" in test_args:
+                assert e.code == 0
+            else:
+                raise
 
     def test_namespace_flag_variations(self):
         """Test that both -n and --namespace work."""
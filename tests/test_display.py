@@ -120,6 +120,33 @@ class TestServiceSelector:
                 sock.close()
 
     @patch("rich.prompt.IntPrompt.ask")
+    def test_ask_int_uses_rich_prompt_on_tty(self, mock_prompt, service_selector):
+        """Test _ask_int delegates to IntPrompt when attached to a terminal."""
+        service_selector._tty = True
+        mock_prompt.return_value = 3
+
+        assert service_selector._ask_int("Select", default=1) == 3
+        mock_prompt.assert_called_once_with("Select", default=1, show_default=True)
+
+    @patch("rich.prompt.IntPrompt.ask")
+    def test_ask_int_plain_input_without_tty(self, mock_prompt, service_selector):
+        """Test _ask_int reads plain input (with default and retry) when not on a TTY."""
+        service_selector._tty = False
+
+        with (
+            patch("builtins.input", side_effect=["abc", "7"]) as mock_input,
+            patch.object(service_selector.console, "print"),
+        ):
+            assert service_selector._ask_int("Select", default=1) == 7
+        assert mock_input.call_count == 2
+        mock_input.assert_called_with("Select [1]: ")
+
+        with patch("builtins.input", return_value=""):
+            assert service_selector._ask_int("Select", default=5, show_default=False) == 5
+
+        mock_prompt.assert_not_called()
+
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_available(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port when port is available."""
         remote_port = 8080
@@ -135,7 +162,7 @@ class TestServiceSelector:
         assert str(remote_port) in args[0]
         assert kwargs["default"] == remote_port
 
-    @patch("rich.prompt.IntPrompt.ask")
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_unavailable(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port when port is unavailable."""
         remote_port = 8080
@@ -155,7 +182,7 @@ class TestServiceSelector:
         assert str(suggested_port) in args[0]
         assert kwargs["default"] == suggested_port
 
-    @patch("rich.prompt.IntPrompt.ask")
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_custom_unavailable(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port when user enters unavailable port."""
         remote_port = 8080
@@ -179,7 +206,7 @@ class TestServiceSelector:
         warning_call = [call for call in mock_print.call_args_list if "Warning" in str(call)]
         assert len(warning_call) > 0
 
-    @patch("rich.prompt.IntPrompt.ask")
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_privileged_available(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port with privileged port (< 1024) that is available after adding 1000."""
         remote_port = 80  # HTTP port (privileged)
@@ -204,7 +231,7 @@ class TestServiceSelector:
         suggested_calls = [call for call in mock_print.call_args_list if "1080" in str(call)]
         assert len(suggested_calls) > 0
 
-    @patch("rich.prompt.IntPrompt.ask")
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_privileged_unavailable(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port with privileged port when suggested port (port+1000) is in use."""
         remote_port = 443  # HTTPS port (privileged)
@@ -234,7 +261,7 @@ class TestServiceSelector:
         ]
         assert len(unavailable_calls) > 0
 
-    @patch("rich.prompt.IntPrompt.ask")
+    @patch.object(ServiceSelector, "_ask_int")
     def test_prompt_for_local_port_non_privileged(self, mock_prompt, service_selector):
         """Test _prompt_for_local_port with non-privileged port (>= 1024) uses existing behavior."""
         remote_port = 8080  # Non-privileged port
@@ -365,6 +392,48 @@ class TestServiceSelectorIntegration:
         ]
         assert len(no_resources_calls) > 0
 
+    def test_select_service_all_namespaces_merges_sorted(self, mock_k8s_client_with_services):
+        """Test resources from every namespace are merged in (namespace, type, name) order."""
+
+        def make(name, namespace, service_type):
+            return ServiceInfo(
+                name=name,
+                namespace=namespace,
+                ports=[{"port": 80}],
+                has_endpoints=True,
+                service_type=service_type,
+            )
+
+        client = mock_k8s_client_with_services
+        client.get_all_services.return_value = {
+            "kube-system": [make("dns", "kube-system", "service")],
+            "default": [make("api", "default", "service"), make("web", "default", "service")],
+        }
+        client.get_pods_with_ports.side_effect = lambda ns: [make(f"{ns}-pod", ns, "pod")]
+        client.get_deployments_with_ports.side_effect = lambda ns: [
+            make(f"{ns}-deploy", ns, "deployment")
+        ]
+
+        with (
+            patch.object(ServiceSelector, "_check_kubectl"),
+            patch.object(
+                ServiceSelector, "_prompt_for_service_selection", return_value=[]
+            ) as mock_prompt,
+        ):
+            selector = ServiceSelector(client)
+            selector.select_service_all_namespaces(include_all_ports=True)
+
+        resources = mock_prompt.call_args.args[0]
+        assert [(r.namespace, r.name) for r in resources] == [
+            ("default", "default-deploy"),
+            ("default", "default-pod"),
+            ("default", "api"),
+            ("default", "web"),
+            ("kube-system", "kube-system-deploy"),
+            ("kube-system", "kube-system-pod"),
+            ("kube-system", "dns"),
+        ]
+
     def test_select_namespace_basic(self, mock_k8s_client_with_services):
         """Test select_namespace with namespaces available."""
         mock_k8s_client_with_services.get_all_namespaces.return_value = ["default", "kube-system"]
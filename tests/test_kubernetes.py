@@ -92,6 +92,26 @@ class TestKubernetesClient:
 
         assert namespace == "default"
 
+    @patch("subprocess.run")
+    def test_get_current_namespace_is_cached(self, mock_run):
+        """Test the current namespace is only read from kubectl once per client."""
+        mock_run.return_value.stdout = "production"
+        mock_run.return_value.returncode = 0
+
+        client = KubernetesClient()
+        mock_run.reset_mock()
+
+        assert client.get_current_namespace() == "production"
+        assert client.get_current_namespace() == "production"
+        mock_run.assert_called_once()
+
+    @patch("subprocess.run")
+    def test_init_can_skip_kubectl_check(self, mock_run):
+        """Test the kubectl availability probe can be skipped."""
+        KubernetesClient(check_kubectl=False)
+
+        mock_run.assert_not_called()
+
     @patch("subprocess.run")
     def test_get_current_namespace_error(self, mock_run):
         """Test getting current namespace when kubectl fails."""
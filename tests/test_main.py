@@ -1,18 +1,29 @@
 """Tests for main module."""
 
+import errno
+import io
 import subprocess
 from unittest.mock import Mock, patch
 
+import pytest
+
+from src.kpf.cli import main as cli_main
 from src.kpf.connectivity import (
+    ConnectivityChecker,
     ConnectivityTestResult,
 )
+from src.kpf.forwarder import PortForwarder
+from src.kpf.logger import Debug
 from src.kpf.main import (
+    _signal_handler,
+    debug,
     get_port_forward_args,
     get_watcher_args,
     restart_event,
     run_port_forward,
     shutdown_event,
 )
+from src.kpf.network_watchdog import NetworkWatchdog
 from src.kpf.validators import (
     extract_kubectl_global_flags,
     extract_local_port,
@@ -23,6 +34,7 @@ from src.kpf.validators import (
     validate_port_format,
     validate_service_and_endpoints,
 )
+from src.kpf.watcher import ENDPOINT_IPS_JSONPATH, EndpointWatcher
 
 
 class TestArgumentParsing:
@@ -40,54 +52,54 @@ class TestArgumentParsing:
             get_port_forward_args([])
             mock_exit.assert_called_once_with(1)
 
-    def test_get_watcher_args_service_with_namespace(self):
-        """Test get_watcher_args with service and namespace."""
-        args = ["svc/frontend", "8080:8080", "-n", "production"]
-        namespace, resource_name = get_watcher_args(args)
-
-        assert namespace == "production"
-        assert resource_name == "frontend"
-
-    def test_get_watcher_args_service_default_namespace(self):
-        """Test get_watcher_args with service but no namespace."""
-        args = ["svc/api-service", "8080:8080"]
-
-        # Mock subprocess.run for kubectl config view --minify namespace lookup
-        with patch("src.kpf.main.subprocess.run") as mock_run:
-            mock_result = Mock()
-            mock_result.stdout = "default"
-            mock_run.return_value = mock_result
-            namespace, resource_name = get_watcher_args(args)
-
-        assert namespace == "default"
-        assert resource_name == "api-service"
-
-    def test_get_watcher_args_pod(self):
-        """Test get_watcher_args with pod resource."""
-        args = ["pod/my-pod", "3000:3000", "-n", "kube-system"]
-        namespace, resource_name = get_watcher_args(args)
-
-        assert namespace == "kube-system"
-        assert resource_name == "my-pod"
-
-    def test_get_watcher_args_deployment(self):
-        """Test get_watcher_args with deployment resource."""
-        args = ["deployment/my-deploy", "8080:8080"]
-
-        # Mock subprocess.run for kubectl config view --minify namespace lookup
-        with patch("src.kpf.main.subprocess.run") as mock_run:
-            mock_result = Mock()
-            mock_result.stdout = "default"
-            mock_run.return_value = mock_result
-            namespace, resource_name = get_watcher_args(args)
-
-        assert namespace == "default"
-        assert resource_name == "my-deploy"
-
-    def test_get_watcher_args_service_full_name(self):
-        """Test get_watcher_args with full 'service' name."""
-        args = ["service/web-service", "80:8080"]
-
+    @pytest.mark.parametrize(
+        "args,expected_namespace,expected_resource",
+        [
+            pytest.param(
+                ["svc/frontend", "8080:8080", "-n", "production"],
+                "production",
+                "frontend",
+                id="service-with-namespace",
+            ),
+            pytest.param(
+                ["svc/api-service", "8080:8080"], "default", "api-service", id="service-default-ns"
+            ),
+            pytest.param(
+                ["pod/my-pod", "3000:3000", "-n", "kube-system"], "kube-system", "my-pod", id="pod"
+            ),
+            pytest.param(
+                ["deployment/my-deploy", "8080:8080"], "default", "my-deploy", id="deployment"
+            ),
+            pytest.param(
+                ["service/web-service", "80:8080"], "default", "web-service", id="service-full-name"
+            ),
+            # A kubeconfig path is not mistaken for a resource
+            pytest.param(
+                ["--kubeconfig", "configs/dev/kubeconfig", "svc/frontend", "8080:80", "-n", "web"],
+                "web",
+                "frontend",
+                id="ignores-path-arguments",
+            ),
+            pytest.param(
+                ["--kubeconfig", "./dev.yaml", "svc/frontend", "8080:80", "-n", "web"],
+                "web",
+                "frontend",
+                id="ignores-relative-kubeconfig",
+            ),
+            pytest.param(
+                ["--kubeconfig", "kube/config", "svc/frontend", "8080:80", "-n", "web"],
+                "web",
+                "frontend",
+                id="ignores-single-slash-kubeconfig",
+            ),
+            # An incomplete -n flag falls back to the current context namespace
+            pytest.param(
+                ["svc/backend", "9090:9090", "-n"], "default", "backend", id="namespace-at-end"
+            ),
+        ],
+    )
+    def test_get_watcher_args(self, args, expected_namespace, expected_resource):
+        """Test get_watcher_args finds the namespace and resource name."""
         # Mock subprocess.run for kubectl config view --minify namespace lookup
         with patch("src.kpf.main.subprocess.run") as mock_run:
             mock_result = Mock()
@@ -95,8 +107,8 @@ class TestArgumentParsing:
             mock_run.return_value = mock_result
             namespace, resource_name = get_watcher_args(args)
 
-        assert namespace == "default"
-        assert resource_name == "web-service"
+        assert namespace == expected_namespace
+        assert resource_name == expected_resource
 
     def test_get_watcher_args_no_resource(self):
         """Test get_watcher_args with no recognizable resource."""
@@ -106,28 +118,12 @@ class TestArgumentParsing:
             get_watcher_args(args)
             mock_exit.assert_called_once_with(1)
 
-    def test_get_watcher_args_namespace_at_end(self):
-        """Test get_watcher_args with namespace flag at the end."""
-        args = ["svc/backend", "9090:9090", "-n"]
-
-        # Should handle incomplete -n flag gracefully and fall back to current context
-        with patch("src.kpf.main.subprocess.run") as mock_run:
-            mock_result = Mock()
-            mock_result.stdout = "default"
-            mock_run.return_value = mock_result
-            namespace, resource_name = get_watcher_args(args)
-
-        assert namespace == "default"  # Falls back to current context namespace
-        assert resource_name == "backend"
-
 
 class TestDebugMode:
     """Test debug functionality."""
 
     def test_debug_disabled_by_default(self):
         """Test that debug is disabled by default."""
-        from src.kpf.main import debug
-
         # Initially should be disabled
         assert debug.enabled is False
 
@@ -155,168 +151,66 @@ class TestDebugMode:
 class TestRunPortForward:
     """Test run_port_forward function."""
 
-    def setUp(self):
-        """Reset threading events before each test."""
-        restart_event.clear()
-        shutdown_event.clear()
-
-    # No teardown needed for threading events as they are cleared in setUp
-
-    @patch("src.kpf.main.NetworkWatchdog")
-    @patch("src.kpf.main.validate_service_and_endpoints")
-    @patch("src.kpf.main.validate_kubectl_command")
-    @patch("src.kpf.main.validate_port_availability")
-    @patch("src.kpf.main.validate_port_format")
-    @patch("src.kpf.main.EndpointWatcher")
-    @patch("src.kpf.main.PortForwarder")
-    @patch("src.kpf.main.get_watcher_args")
-    def test_run_port_forward_basic(
-        self,
-        mock_get_watcher,
-        mock_forwarder,
-        mock_watcher,
-        mock_port_format,
-        mock_port_avail,
-        mock_kubectl,
-        mock_service,
-        mock_network_watchdog,
-    ):
+    def test_run_port_forward_basic(self, mocked_main):
         """Test basic run_port_forward execution."""
-        mock_get_watcher.return_value = ("default", "test-service")
-
-        # Mock all validations to pass
-        mock_port_format.return_value = True
-        mock_port_avail.return_value = True
-        mock_kubectl.return_value = True
-        mock_service.return_value = True
-
-        # Mock threads that exit immediately
-        mock_pf_instance = Mock()
-        mock_ew_instance = Mock()
-        mock_watchdog_instance = Mock()
-        mock_pf_instance.is_alive.return_value = False
-        mock_ew_instance.is_alive.return_value = False
-        mock_watchdog_instance.is_alive.return_value = False
-
-        mock_forwarder.return_value = mock_pf_instance
-        mock_watcher.return_value = mock_ew_instance
-        mock_network_watchdog.return_value = mock_watchdog_instance
-
         args = ["svc/test-service", "8080:8080"]
 
         # Just run normally - threads will exit immediately
         run_port_forward(args)
 
         # Verify threads were created and started
+        mock_pf_instance = mocked_main.forwarder.return_value
+        mock_ew_instance = mocked_main.watcher.return_value
         mock_pf_instance.start.assert_called_once()
         mock_ew_instance.start.assert_called_once()
         mock_pf_instance.join.assert_called_once()
         mock_ew_instance.join.assert_called_once()
 
-    @patch("src.kpf.main.NetworkWatchdog")
-    @patch("src.kpf.main.validate_service_and_endpoints")
-    @patch("src.kpf.main.validate_kubectl_command")
-    @patch("src.kpf.main.validate_port_availability")
-    @patch("src.kpf.main.validate_port_format")
-    @patch("src.kpf.main.EndpointWatcher")
-    @patch("src.kpf.main.PortForwarder")
-    @patch("src.kpf.main.get_watcher_args")
-    def test_run_port_forward_debug_mode(
-        self,
-        mock_get_watcher,
-        mock_forwarder,
-        mock_watcher,
-        mock_port_format,
-        mock_port_avail,
-        mock_kubectl,
-        mock_service,
-        mock_network_watchdog,
-    ):
+    def test_run_port_forward_debug_mode(self, mocked_main):
         """Test run_port_forward with debug mode enabled."""
-        mock_get_watcher.return_value = ("default", "test-service")
-
-        # Mock all validations to pass
-        mock_port_format.return_value = True
-        mock_port_avail.return_value = True
-        mock_kubectl.return_value = True
-        mock_service.return_value = True
-
-        # Mock threads that exit immediately
-        mock_pf_instance = Mock()
-        mock_ew_instance = Mock()
-        mock_watchdog_instance = Mock()
-        mock_pf_instance.is_alive.return_value = False
-        mock_ew_instance.is_alive.return_value = False
-        mock_watchdog_instance.is_alive.return_value = False
-
-        mock_forwarder.return_value = mock_pf_instance
-        mock_watcher.return_value = mock_ew_instance
-        mock_network_watchdog.return_value = mock_watchdog_instance
-
         args = ["svc/test-service", "8080:8080"]
 
-        with patch("src.kpf.main.console.print"):
+        # run_port_forward turns on the shared debug instance; restore it afterwards
+        with (
+            patch("src.kpf.main.debug.enabled", False),
+            patch("src.kpf.main.console.print") as mock_print,
+        ):
             run_port_forward(args, debug_mode=True)
-            # Verify debug messages were printed (checking for [DEBUG] in calls)
-            # Since we mocked console.print, we check if it was called with something that looks like debug
-            # debug.print uses console.print, and preprends [DEBUG] usually if using the real class,
-            # but here we rely on run_port_forward passing debug_mode=True to the orchestrator.
-            # The orchestrator sets up debug.
-
-    @patch("src.kpf.main.NetworkWatchdog")
-    @patch("src.kpf.main.validate_service_and_endpoints")
-    @patch("src.kpf.main.validate_kubectl_command")
-    @patch("src.kpf.main.validate_port_availability")
-    @patch("src.kpf.main.validate_port_format")
-    @patch("src.kpf.main.EndpointWatcher")
-    @patch("src.kpf.main.PortForwarder")
-    @patch("src.kpf.main.get_watcher_args")
-    @patch("src.kpf.main.shutdown_event")
-    def test_run_port_forward_keyboard_interrupt(
-        self,
-        mock_shutdown_event,
-        mock_get_watcher,
-        mock_forwarder,
-        mock_watcher,
-        mock_port_format,
-        mock_port_avail,
-        mock_kubectl,
-        mock_service,
-        mock_network_watchdog,
-    ):
+
+            # Check the message text itself rather than str(call), which reprs the whole call
+            debug_calls = [
+                c
+                for c in mock_print.call_args_list
+                if c.args and isinstance(c.args[0], str) and "[DEBUG]" in c.args[0]
+            ]
+            assert debug_calls
+            assert mocked_main.forwarder.call_args.kwargs["debug_callback"] is not None
+
+    @patch("src.kpf.main._sigint_count", 0)
+    def test_run_port_forward_keyboard_interrupt(self, mocked_main):
         """Test run_port_forward handling keyboard interrupt."""
-        mock_get_watcher.return_value = ("default", "test-service")
-
-        # Mock all validations to pass
-        mock_port_format.return_value = True
-        mock_port_avail.return_value = True
-        mock_kubectl.return_value = True
-        mock_service.return_value = True
-
-        # Mock threads
-        mock_pf_instance = Mock()
-        mock_ew_instance = Mock()
-        mock_watchdog_instance = Mock()
-        # Make threads appear alive initially, then dead after shutdown
-        mock_pf_instance.is_alive.side_effect = [True, True, False]
-        mock_ew_instance.is_alive.side_effect = [True, True, False]
-        mock_watchdog_instance.is_alive.return_value = False
-
-        mock_forwarder.return_value = mock_pf_instance
-        mock_watcher.return_value = mock_ew_instance
-        mock_network_watchdog.return_value = mock_watchdog_instance
-
-        # Mock shutdown event to trigger shutdown after first check
-        mock_shutdown_event.is_set.side_effect = [False, True]
+        import signal
+
+        # The threads run until shutdown is requested, like the real ones
+        mock_pf_instance = mocked_main.forwarder.return_value
+        mock_ew_instance = mocked_main.watcher.return_value
+        mock_pf_instance.is_alive.side_effect = lambda: not shutdown_event.is_set()
+        mock_ew_instance.is_alive.side_effect = lambda: not shutdown_event.is_set()
+
+        # Ctrl+C arrives once both threads have started
+        mock_ew_instance.start.side_effect = lambda: _signal_handler(signal.SIGINT, None)
 
         args = ["svc/test-service", "8080:8080"]
 
-        # Run port forward (will exit due to shutdown event)
-        run_port_forward(args)
+        with patch("src.kpf.main.console.print") as mock_print:
+            run_port_forward(args)
 
         # Verify graceful shutdown
+        assert shutdown_event.is_set()
+        assert any("Ctrl+C detected" in c.args[0] for c in mock_print.call_args_list if c.args)
         mock_pf_instance.join.assert_called()
         mock_ew_instance.join.assert_called()
+        mock_ew_instance.terminate_process.assert_called()
 
 
 class TestEndpointWatcherThread:
@@ -324,8 +218,6 @@ class TestEndpointWatcherThread:
 
     def test_endpoint_watcher_thread_args(self):
         """Test that endpoint watcher thread uses correct kubectl command."""
-        from src.kpf.watcher import EndpointWatcher  # Import from new location
-
         # We need to instantiate EndpointWatcher class now
         watcher = EndpointWatcher(
             "production", "my-service", shutdown_event, restart_event, lambda: True
@@ -336,10 +228,6 @@ class TestEndpointWatcherThread:
             mock_process.stdout = iter([])  # Empty output
             mock_popen.return_value = mock_process
 
-            # Clear events first
-            shutdown_event.clear()
-            restart_event.clear()
-
             # Use side_effect to set shutdown after Popen is called
             def set_shutdown(*args, **kwargs):
                 shutdown_event.set()
@@ -347,8 +235,6 @@ class TestEndpointWatcherThread:
 
             mock_popen.side_effect = set_shutdown
 
-            mock_popen.side_effect = set_shutdown
-
             watcher.endpoint_watcher_thread()
 
             # Verify kubectl get ep command was called correctly
@@ -357,71 +243,100 @@ class TestEndpointWatcherThread:
             expected_cmd = [
                 "kubectl",
                 "get",
-                "--no-headers",
                 "ep",
                 "-w",
                 "-n",
                 "production",
                 "my-service",
+                "-o",
+                ENDPOINT_IPS_JSONPATH,
             ]
             assert call_args == expected_cmd
 
-        # Clean up
-        shutdown_event.clear()
-        restart_event.clear()
-
     def test_endpoint_watcher_restart_event(self):
         """Test that endpoint watcher sets restart event on changes."""
-        from src.kpf.main import restart_event, shutdown_event
-        from src.kpf.watcher import EndpointWatcher
-
         namespace = "default"
         resource_name = "test-service"
         watcher = EndpointWatcher(
             namespace, resource_name, shutdown_event, restart_event, lambda: True
         )
 
-        # Mock subprocess output with endpoint changes
+        # kubectl's stdout as the watcher really reads it: a buffered text pipe.
+        # The first snapshot is the initial state; the second one is a change.
+        output = b"10.0.0.1\n---\n10.0.0.2\n---\n"
+
+        with patch("subprocess.Popen") as mock_popen:
+            mock_process = Mock()
+            mock_process.stdout = io.TextIOWrapper(io.BufferedReader(io.BytesIO(output)))
+
+            # The watcher waits on kubectl once its output hits EOF; shut down then
+            def stop_after_stream(*args, **kwargs):
+                shutdown_event.set()
+
+            mock_process.wait.side_effect = stop_after_stream
+            mock_popen.return_value = mock_process
+
+            watcher.endpoint_watcher_thread()
+
+            # Verify restart event was set
+            assert restart_event.is_set()
+
+    def test_endpoint_watcher_restarts_only_on_address_change(self):
+        """Test that only a changed set of endpoint IPs triggers a restart."""
+        should_restart = Mock(return_value=True)
+        watcher = EndpointWatcher(
+            "default", "test-service", shutdown_event, restart_event, should_restart
+        )
+
         mock_lines = [
-            "test-service   10.0.0.1:8080   1m",  # This should trigger restart
+            "10.0.0.1\n",
+            "10.0.0.2\n",
+            "---\n",  # Initial state
+            "10.0.0.2\n",
+            "10.0.0.1\n",
+            "---\n",  # Same addresses, reordered
+            "10.0.0.1\n",
+            "10.0.0.3\n",
+            "---\n",  # Pod replaced
         ]
 
         with patch("subprocess.Popen") as mock_popen:
             mock_process = Mock()
             mock_process.stdout = iter(mock_lines)
-            mock_popen.return_value = mock_process
-
-            # Clear events initially
-            restart_event.clear()
-            shutdown_event.clear()
 
-            # Create a side effect that processes one line then shuts down
-            def process_and_shutdown(*args, **kwargs):
-                # Process the mock lines, then set shutdown
-                for line in mock_lines:
-                    restart_event.set()  # Simulate the restart event being set
+            def stop_after_stream(*args, **kwargs):
                 shutdown_event.set()
-                return mock_process
-
-            mock_popen.side_effect = process_and_shutdown
 
-            mock_popen.side_effect = process_and_shutdown
+            mock_process.wait.side_effect = stop_after_stream
+            mock_popen.return_value = mock_process
 
             watcher.endpoint_watcher_thread()
 
-            # Verify restart event was set
-            assert restart_event.is_set()
+        should_restart.assert_called_once()
+        assert restart_event.is_set()
+
+    def test_endpoint_watcher_debounces_change_bursts(self):
+        """Test that a burst of endpoint changes causes a single restart once it settles."""
+        should_restart = Mock(return_value=True)
+        watcher = EndpointWatcher(
+            "default",
+            "test-service",
+            shutdown_event,
+            restart_event,
+            should_restart,
+            debounce_seconds=0.2,
+        )
 
-        # Clean up
-        restart_event.clear()
-        shutdown_event.clear()
+        # e.g. a rolling deployment replacing pods one after another
+        for _ in range(3):
+            watcher._schedule_restart()
+        assert not restart_event.is_set()
 
-    @patch("time.sleep")
-    def test_endpoint_watcher_delay_on_restart(self, mock_sleep):
-        """Test that endpoint watcher waits 2 seconds before restarting kubectl process."""
-        from src.kpf.main import restart_event, shutdown_event
-        from src.kpf.watcher import EndpointWatcher
+        assert restart_event.wait(timeout=5)
+        should_restart.assert_called_once()
 
+    def test_endpoint_watcher_delay_on_restart(self):
+        """Test that endpoint watcher waits 2 seconds before restarting kubectl process."""
         namespace = "default"
         resource_name = "test-service"
         watcher = EndpointWatcher(
@@ -435,9 +350,6 @@ class TestEndpointWatcherThread:
             mock_process.wait.return_value = None  # Process exits
             mock_popen.return_value = mock_process
 
-            # Clear events first
-            shutdown_event.clear()
-
             # Set shutdown after first iteration to prevent infinite loop
             call_count = [0]
 
@@ -449,15 +361,57 @@ class TestEndpointWatcherThread:
 
             mock_popen.side_effect = side_effect
 
-            mock_popen.side_effect = side_effect
+            with patch.object(shutdown_event, "wait") as mock_wait:
+                watcher.endpoint_watcher_thread()
 
-            watcher.endpoint_watcher_thread()
+            # Verify that the watcher waited 2 seconds (interruptible by shutdown)
+            mock_wait.assert_called_with(2)
+
+    def test_endpoint_watcher_terminate_unblocks_read(self):
+        """Test terminating the watch process ends a thread blocked waiting for output."""
+        import sys
+        import time
+
+        watcher = EndpointWatcher(
+            "default", "test-service", shutdown_event, restart_event, lambda: True
+        )
+
+        # A silent long-running process stands in for an idle `kubectl get -w`
+        silent_process = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        with (
+            patch("subprocess.Popen", return_value=silent_process),
+            patch("src.kpf.watcher.console.print") as mock_print,
+        ):
+            watcher.start()
+            for _ in range(100):
+                if watcher.proc is not None:
+                    break
+                time.sleep(0.01)
+
+            shutdown_event.set()
+            watcher.terminate_process()
+            watcher.join(timeout=2)
+
+        assert not watcher.is_alive()
+        assert not [call for call in mock_print.call_args_list if "error" in str(call)]
 
-            # Verify that sleep was called with 2 seconds
-            mock_sleep.assert_called_with(2)
+    def test_endpoint_watcher_exit_sets_shutdown_event(self):
+        """Test that the watcher thread signals shutdown when it exits unexpectedly."""
+        watcher = EndpointWatcher(
+            "default", "test-service", shutdown_event, restart_event, lambda: True
+        )
+
+        # Thread body returns without having set shutdown itself
+        with patch.object(watcher, "endpoint_watcher_thread", return_value=None):
+            watcher.start()
+            watcher.join(timeout=1)
 
-        # Clean up
-        shutdown_event.clear()
+        assert shutdown_event.is_set()
 
 
 class TestPortValidation:
@@ -487,6 +441,12 @@ class TestPortValidation:
         port = extract_local_port(args)
         assert port is None
 
+    def test_extract_local_port_random_local_port(self):
+        """Test a mapping that leaves the local port to kubectl has no local port."""
+        args = ["svc/test", ":80", "-n", "default"]
+        port = extract_local_port(args)
+        assert port is None
+
     def test_extract_local_port_flag_with_colon(self):
         """Test that flags with colons are ignored."""
         args = ["svc/test", "-n", "namespace:with:colons", "8080:80"]
@@ -506,16 +466,38 @@ class TestPortValidation:
         """Test port availability check with a bound port."""
         import socket
 
-        test_port = 19997
+        # Kept on a real socket: this checks the kernel refuses the SO_REUSEADDR probe
+        # for a bound port. Port 0 lets the OS pick one no other process holds.
         test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            test_socket.bind(("localhost", test_port))
+            test_socket.bind(("localhost", 0))
+            test_port = test_socket.getsockname()[1]
             is_available, error_reason = is_port_available(test_port)
             assert is_available is False
             assert error_reason == "in_use"
         finally:
             test_socket.close()
 
+    def test_is_port_available_ignores_time_wait(self):
+        """Test a port held only by TIME_WAIT connections is reported available."""
+        import socket
+
+        test_port = 19996
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(("localhost", test_port))
+        listener.listen(1)
+        client = socket.create_connection(("localhost", test_port))
+        conn, _addr = listener.accept()
+        # Closing the server side first leaves its connection in TIME_WAIT on test_port
+        conn.close()
+        client.close()
+        listener.close()
+
+        is_available, error_reason = is_port_available(test_port)
+        assert is_available is True
+        assert error_reason == ""
+
     def test_validate_port_availability_available(self):
         """Test port validation with an available port."""
         args = ["svc/test", "19996:80", "-n", "default"]
@@ -524,27 +506,25 @@ class TestPortValidation:
 
     def test_validate_port_availability_in_use(self):
         """Test port validation with a port in use."""
-        import socket
+        args = ["svc/test", "19995:80", "-n", "default"]
 
-        test_port = 19995
-        test_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            test_socket.bind(("localhost", test_port))
-            args = ["svc/test", f"{test_port}:80", "-n", "default"]
-
-            with patch("src.kpf.validators.console.print") as mock_print:
-                # Disable auto-select to test the error case
-                config = {"autoSelectFreePort": False}
-                result = validate_port_availability(args, config=config)
-                assert result is False
-
-                # Check that error message was printed
-                error_calls = [
-                    call for call in mock_print.call_args_list if "already in use" in str(call)
-                ]
-                assert len(error_calls) > 0
-        finally:
-            test_socket.close()
+        with (
+            patch("src.kpf.validators.socket.socket") as mock_socket,
+            patch("src.kpf.validators.console.print") as mock_print,
+        ):
+            mock_sock = mock_socket.return_value.__enter__.return_value
+            mock_sock.bind.side_effect = OSError(errno.EADDRINUSE, "Address already in use")
+
+            # Disable auto-select to test the error case
+            config = {"autoSelectFreePort": False}
+            result = validate_port_availability(args, config=config)
+            assert result is False
+
+            # Check that error message was printed
+            error_calls = [
+                call for call in mock_print.call_args_list if "already in use" in str(call)
+            ]
+            assert len(error_calls) > 0
 
     def test_validate_port_availability_no_port(self):
         """Test port validation when no port can be extracted."""
@@ -555,8 +535,6 @@ class TestPortValidation:
     @patch("src.kpf.connectivity.socket.socket")
     def test_test_port_forward_health_success(self, mock_socket):
         """Test port-forward health check success."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         # args variable removed as it was unused
@@ -570,11 +548,10 @@ class TestPortValidation:
         assert result is True
 
     @patch("src.kpf.connectivity.socket.socket")
-    @patch("time.sleep")
-    def test_test_port_forward_health_timeout(self, mock_sleep, mock_socket):
+    @patch("src.kpf.connectivity.time.monotonic", side_effect=[0.0, 0.0, 0.5, 1.0])
+    @patch("src.kpf.connectivity.time.sleep")
+    def test_test_port_forward_health_timeout(self, mock_sleep, mock_monotonic, mock_socket):
         """Test port-forward health check timeout."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         # Mock connection failure (different error code)
@@ -584,27 +561,23 @@ class TestPortValidation:
 
         result = checker.test_port_forward_health(8080, timeout=1)
         assert result is False
+        # The fake clock runs out after two probes, without waiting out the timeout
+        assert mock_sock_instance.connect_ex.call_count == 2
 
     def test_test_port_forward_health_no_port(self):
         """Test port-forward health check when no port can be extracted."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         result = checker.test_port_forward_health(None)
         assert result is True  # Should return True when can't test
 
     @patch("src.kpf.connectivity.ConnectivityChecker.test_port_forward_health")
+    @patch("src.kpf.forwarder.time.sleep")
     @patch("subprocess.Popen")
-    def test_port_forward_thread_health_check_fails(self, mock_popen, mock_health_check):
+    def test_port_forward_thread_health_check_fails(
+        self, mock_popen, mock_sleep, mock_health_check
+    ):
         """Test port-forward thread when health check fails."""
-        from src.kpf.forwarder import PortForwarder
-        from src.kpf.main import restart_event, shutdown_event
-
-        # Reset events
-        restart_event.clear()
-        shutdown_event.clear()
-
         args = ["svc/test", "8080:80", "-n", "default"]
 
         forwarder = PortForwarder(args, shutdown_event, restart_event)
@@ -637,88 +610,119 @@ class TestPortValidation:
 
             assert restart_event.is_set()
 
-        # Clean up
-        shutdown_event.clear()
-        restart_event.clear()
-
+    @patch("src.kpf.forwarder.time.sleep")
+    @patch("src.kpf.connectivity.ConnectivityChecker.test_port_forward_health")
+    @patch("subprocess.Popen")
+    def test_port_forward_thread_kills_failed_process_before_retry(
+        self, mock_popen, mock_health_check, mock_sleep
+    ):
+        """Test a port-forward that fails its health check is killed before the retry."""
+        forwarder = PortForwarder(
+            ["svc/test", "8080:80", "-n", "default"], shutdown_event, restart_event
+        )
 
-class TestArgumentValidation:
-    """Test argument validation functions."""
+        first_process, second_process = Mock(), Mock()
+        mock_popen.side_effect = [first_process, second_process]
 
-    def test_validate_port_format_valid(self):
-        """Test port format validation with valid ports."""
-        from src.kpf.validators import validate_port_format
+        # Fail both health checks, shutting down during the retry
+        def side_effect(*args, **kwargs):
+            if mock_health_check.call_count == 2:
+                shutdown_event.set()
+            return False
 
-        args = ["svc/test", "8080:80", "-n", "default"]
-        result = validate_port_format(args)
-        assert result is True
+        mock_health_check.side_effect = side_effect
 
-    def test_validate_port_format_invalid_local_port(self):
-        """Test port format validation with invalid local port."""
-        from src.kpf.validators import validate_port_format
+        with patch("src.kpf.forwarder.console.print"):
+            forwarder.port_forward_thread()
 
-        args = ["svc/test", "707x:80", "-n", "default"]
+        first_process.terminate.assert_called_once()
+        assert mock_popen.call_count == 2
 
-        with patch("src.kpf.validators.console.print") as mock_print:
-            result = validate_port_format(args)
-            assert result is False
+    def test_wait_until_forwarding_sees_ready_line(self):
+        """Test the forwarder proceeds as soon as kubectl reports it is forwarding."""
+        import sys
 
-            error_calls = [
-                call for call in mock_print.call_args_list if "Invalid port format" in str(call)
-            ]
-            assert len(error_calls) > 0
+        forwarder = PortForwarder(["svc/test", "8080:80"], shutdown_event, restart_event)
 
-    def test_validate_port_format_invalid_remote_port(self):
-        """Test port format validation with invalid remote port."""
-        args = ["svc/test", "8080:80x", "-n", "default"]
+        # Print the readiness line, then keep running like kubectl does
+        script = (
+            "import time; print('Forwarding from 127.0.0.1:8080 -> 80', flush=True); time.sleep(30)"
+        )
+        proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+        try:
+            assert forwarder._wait_until_forwarding(proc) is True
+        finally:
+            proc.kill()
+            proc.wait()
+            proc.stdout.close()
 
-        with patch("src.kpf.validators.console.print"):
-            result = validate_port_format(args)
-            assert result is False
+    def test_wait_until_forwarding_process_exits(self):
+        """Test the readiness wait ends when kubectl exits without forwarding."""
+        import sys
 
-    def test_validate_port_format_out_of_range_low(self):
-        """Test port format validation with port number too low."""
-        args = ["svc/test", "0:80", "-n", "default"]
+        forwarder = PortForwarder(["svc/test", "8080:80"], shutdown_event, restart_event)
 
-        with patch("src.kpf.validators.console.print") as mock_print:
-            result = validate_port_format(args)
-            assert result is False
+        script = "print('error: unable to forward port')"
+        proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+        try:
+            assert forwarder._wait_until_forwarding(proc) is False
+        finally:
+            proc.wait()
+            proc.stdout.close()
 
-            error_calls = [
-                call for call in mock_print.call_args_list if "not in valid range" in str(call)
-            ]
-            assert len(error_calls) > 0
+    def test_discard_output_keeps_pipe_from_filling(self):
+        """Test kubectl's output keeps being read so it can't block on a full pipe."""
+        import sys
 
-    def test_validate_port_format_out_of_range_high(self):
-        """Test port format validation with port number too high."""
-        args = ["svc/test", "8080:99999", "-n", "default"]
+        forwarder = PortForwarder(["svc/test", "8080:80"], shutdown_event, restart_event)
 
-        with patch("src.kpf.validators.console.print"):
-            result = validate_port_format(args)
-            assert result is False
+        # Far more than a pipe buffer holds, like a long run of "Handling connection" lines
+        script = "import sys; sys.stdout.write('Handling connection for 8080\\n' * 40000)"
+        proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE)
+        try:
+            thread = forwarder._discard_output(proc)
+            assert proc.wait(timeout=10) == 0
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        finally:
+            proc.kill()
+            proc.wait()
+            proc.stdout.close()
 
-    def test_validate_port_format_no_colon(self):
-        """Test port format validation with no port mapping."""
-        args = ["svc/test", "-n", "default"]
 
-        with patch("src.kpf.validators.console.print") as mock_print:
-            result = validate_port_format(args)
-            assert result is False
+class TestArgumentValidation:
+    """Test argument validation functions."""
 
-            error_calls = [
-                call
-                for call in mock_print.call_args_list
-                if "No valid port mapping found" in str(call)
-            ]
-            assert len(error_calls) > 0
+    def test_validate_port_format_valid(self):
+        """Test port format validation with valid ports."""
+        args = ["svc/test", "8080:80", "-n", "default"]
+        result = validate_port_format(args)
+        assert result is True
 
-    def test_validate_port_format_malformed_mapping(self):
-        """Test port format validation with malformed port mapping."""
-        args = ["svc/test", "8080:", "-n", "default"]
+    @pytest.mark.parametrize(
+        "args,expected_message",
+        [
+            pytest.param(
+                ["svc/test", "707x:80", "-n", "default"], "Invalid port format", id="local-port"
+            ),
+            pytest.param(["svc/test", "8080:80x", "-n", "default"], None, id="remote-port"),
+            pytest.param(
+                ["svc/test", "0:80", "-n", "default"], "not in valid range", id="out-of-range-low"
+            ),
+            pytest.param(["svc/test", "8080:99999", "-n", "default"], None, id="out-of-range-high"),
+            pytest.param(
+                ["svc/test", "-n", "default"], "No valid port mapping found", id="no-colon"
+            ),
+            pytest.param(["svc/test", "8080:", "-n", "default"], None, id="malformed-mapping"),
+        ],
+    )
+    def test_validate_port_format_invalid(self, args, expected_message, capsys):
+        """Test port format validation rejects bad port mappings."""
+        result = validate_port_format(args)
+        assert result is False
 
-        with patch("src.kpf.validators.console.print"):
-            result = validate_port_format(args)
-            assert result is False
+        if expected_message:
+            assert expected_message in capsys.readouterr().out
 
     @patch("subprocess.run")
     def test_validate_kubectl_command_success(self, mock_run):
@@ -796,29 +800,16 @@ class TestArgumentValidation:
             ]
             assert len(notfound_calls) > 0
 
-    def test_integration_invalid_port_format_cli(self):
-        """Integration test for invalid port format via CLI."""
-        import subprocess
-        import sys
+    def test_integration_invalid_port_format_cli(self, monkeypatch, capsys):
+        """Integration test for invalid port format via the CLI entry point."""
+        # Run the CLI entry point in-process; the port is rejected before kubectl is needed
+        monkeypatch.setattr("sys.argv", ["kpf", "svc/test", "707x:80", "-n", "default"])
 
-        result = subprocess.run(
-            [
-                sys.executable,
-                "-m",
-                "src.kpf.cli",
-                "svc/test",
-                "707x:80",
-                "-n",
-                "default",
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            check=False,
-        )
+        with pytest.raises(SystemExit) as exc_info:
+            cli_main()
 
-        assert result.returncode == 1
-        assert "Invalid port format" in result.stdout
+        assert exc_info.value.code == 1
+        assert "Invalid port format" in capsys.readouterr().out
 
 
 class TestServiceValidation:
@@ -843,28 +834,57 @@ class TestServiceValidation:
             error_calls = [call for call in mock_print.call_args_list if "not found" in str(call)]
             assert len(error_calls) > 0
 
+    @staticmethod
+    def _kubectl_list(*items, returncode=0, stderr=""):
+        """Build the result of `kubectl get svc/NAME endpoints/NAME -o json`."""
+        import json
+
+        result = Mock()
+        result.returncode = returncode
+        result.stdout = json.dumps({"apiVersion": "v1", "kind": "List", "items": list(items)})
+        result.stderr = stderr
+        return result
+
     @patch("subprocess.run")
-    def test_validate_service_and_endpoints_no_endpoints(self, mock_run):
-        """Test service validation when service has no endpoints."""
-        args = ["svc/no-endpoints", "8080:80", "-n", "default"]
+    def test_validate_service_and_endpoints_single_kubectl_call(self, mock_run):
+        """Test the service and its endpoints are fetched with one kubectl call."""
+        args = ["svc/working-service", "8080:80", "-n", "default"]
+        mock_run.return_value = self._kubectl_list(
+            {"kind": "Service", "metadata": {"name": "working-service"}},
+            {"kind": "Endpoints", "subsets": [{"addresses": [{"ip": "10.0.0.1"}]}]},
+        )
 
-        # Mock service exists but no endpoints
-        def mock_subprocess(*cmd_args, **kwargs):
-            cmd = cmd_args[0]
-            result = Mock()
+        assert validate_service_and_endpoints(args) is True
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd[:4] == ["kubectl", "get", "svc/working-service", "endpoints/working-service"]
 
-            if "get svc" in " ".join(cmd):
-                # Service exists
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "no-endpoints"}}'
-            elif "get endpoints" in " ".join(cmd):
-                # No endpoints
-                result.returncode = 1
-                result.stderr = "endpoints 'no-endpoints' not found"
+    @patch("subprocess.run")
+    def test_validate_service_and_endpoints_reuses_namespace(self, mock_run):
+        """Test a resolved namespace skips the current-context namespace lookup."""
+        args = ["svc/working-service", "8080:80"]
+        mock_run.return_value = self._kubectl_list(
+            {"kind": "Service", "metadata": {"name": "working-service"}},
+            {"kind": "Endpoints", "subsets": [{"addresses": [{"ip": "10.0.0.1"}]}]},
+        )
 
-            return result
+        assert validate_service_and_endpoints(args, namespace="team-a") is True
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert "config" not in cmd
+        assert cmd[cmd.index("-n") + 1] == "team-a"
+
+    @patch("subprocess.run")
+    def test_validate_service_and_endpoints_no_endpoints(self, mock_run):
+        """Test service validation when service has no endpoints."""
+        args = ["svc/no-endpoints", "8080:80", "-n", "default"]
 
-        mock_run.side_effect = mock_subprocess
+        # Service exists but no endpoints: kubectl prints the service and exits non-zero
+        mock_run.return_value = self._kubectl_list(
+            {"kind": "Service", "metadata": {"name": "no-endpoints"}},
+            returncode=1,
+            stderr='Error from server (NotFound): endpoints "no-endpoints" not found',
+        )
 
         with patch("src.kpf.validators.console.print") as mock_print:
             result = validate_service_and_endpoints(args)
@@ -881,25 +901,11 @@ class TestServiceValidation:
         """Test service validation when service has empty endpoints."""
         args = ["svc/empty-endpoints", "8080:80", "-n", "default"]
 
-        # Mock service exists but endpoints are empty
-        def mock_subprocess(*cmd_args, **kwargs):
-            cmd = cmd_args[0]
-            result = Mock()
-
-            if "get svc" in " ".join(cmd):
-                # Service exists
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "empty-endpoints"}}'
-            elif "get endpoints" in " ".join(cmd):
-                # Endpoints exist but are empty
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "empty-endpoints"}, "subsets": []}'
-
-            return result
-
-        mock_run.side_effect = mock_subprocess
-
-        mock_run.side_effect = mock_subprocess
+        # Service exists but endpoints are empty
+        mock_run.return_value = self._kubectl_list(
+            {"kind": "Service", "metadata": {"name": "empty-endpoints"}},
+            {"kind": "Endpoints", "metadata": {"name": "empty-endpoints"}, "subsets": []},
+        )
 
         with patch("src.kpf.validators.console.print") as mock_print:
             result = validate_service_and_endpoints(args)
@@ -916,25 +922,15 @@ class TestServiceValidation:
         """Test service validation displays selector when no endpoints are ready."""
         args = ["svc/selector-service", "8080:80", "-n", "default"]
 
-        # Mock service exists and has selector
-        def mock_subprocess(*cmd_args, **kwargs):
-            cmd = cmd_args[0]
-            result = Mock()
-
-            if "get svc" in " ".join(cmd):
-                # Service exists with selector
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "selector-service"}, "spec": {"selector": {"app": "myapp", "tier": "backend"}}}'
-            elif "get endpoints" in " ".join(cmd):
-                # No ready endpoints
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "selector-service"}, "subsets": []}'
-
-            return result
-
-        mock_run.side_effect = mock_subprocess
-
-        mock_run.side_effect = mock_subprocess
+        # Service exists with a selector but has no ready endpoints
+        mock_run.return_value = self._kubectl_list(
+            {
+                "kind": "Service",
+                "metadata": {"name": "selector-service"},
+                "spec": {"selector": {"app": "myapp", "tier": "backend"}},
+            },
+            {"kind": "Endpoints", "metadata": {"name": "selector-service"}, "subsets": []},
+        )
 
         with patch("src.kpf.validators.console.print") as mock_print:
             result = validate_service_and_endpoints(args)
@@ -955,33 +951,15 @@ class TestServiceValidation:
         """Test service validation when service has ready endpoints."""
         args = ["svc/working-service", "8080:80", "-n", "default"]
 
-        # Mock service exists with ready endpoints
-        def mock_subprocess(*cmd_args, **kwargs):
-            cmd = cmd_args[0]
-            result = Mock()
-
-            if "get svc" in " ".join(cmd):
-                # Service exists
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "working-service"}}'
-            elif "get endpoints" in " ".join(cmd):
-                # Endpoints exist with ready addresses
-                result.returncode = 0
-                result.stdout = """
-                {
-                    "metadata": {"name": "working-service"},
-                    "subsets": [
-                        {
-                            "addresses": [{"ip": "10.0.0.1"}],
-                            "ports": [{"port": 80}]
-                        }
-                    ]
-                }
-                """
-
-            return result
-
-        mock_run.side_effect = mock_subprocess
+        # Service exists with ready endpoints
+        mock_run.return_value = self._kubectl_list(
+            {"kind": "Service", "metadata": {"name": "working-service"}},
+            {
+                "kind": "Endpoints",
+                "metadata": {"name": "working-service"},
+                "subsets": [{"addresses": [{"ip": "10.0.0.1"}], "ports": [{"port": 80}]}],
+            },
+        )
 
         result = validate_service_and_endpoints(args)
         assert result is True
@@ -1073,8 +1051,6 @@ class TestConnectivityTesting:
 
     def test_test_socket_connectivity_success(self):
         """Test socket connectivity test with successful connection."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         with patch("socket.socket") as mock_socket:
@@ -1088,8 +1064,6 @@ class TestConnectivityTesting:
 
     def test_test_socket_connectivity_connection_refused(self):
         """Test socket connectivity test with connection refused."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         with patch("socket.socket") as mock_socket:
@@ -1103,8 +1077,6 @@ class TestConnectivityTesting:
 
     def test_test_socket_connectivity_failure(self):
         """Test socket connectivity test with connection failure."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         with patch("socket.socket") as mock_socket:
@@ -1118,8 +1090,6 @@ class TestConnectivityTesting:
 
     def test_test_socket_connectivity_exception(self):
         """Test socket connectivity test with socket exception."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         with patch("socket.socket") as mock_socket:
@@ -1132,8 +1102,6 @@ class TestConnectivityTesting:
     @patch("requests.get")
     def test_test_http_connectivity_success(self, mock_get):
         """Test HTTP connectivity test with successful response."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_response = Mock()
@@ -1147,8 +1115,6 @@ class TestConnectivityTesting:
     @patch("requests.get")
     def test_test_http_connectivity_404_is_success(self, mock_get):
         """Test that HTTP 404 is considered successful connectivity."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_response = Mock()
@@ -1164,8 +1130,6 @@ class TestConnectivityTesting:
         """Test HTTP connectivity test with connection error."""
         import requests
 
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_get.side_effect = requests.exceptions.ConnectionError("Connection failed")
@@ -1179,8 +1143,6 @@ class TestConnectivityTesting:
         """Test HTTP connectivity test with timeout."""
         import requests
 
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_get.side_effect = requests.exceptions.Timeout("Request timed out")
@@ -1193,8 +1155,6 @@ class TestConnectivityTesting:
     @patch("time.time")
     def test_test_http_connectivity_rate_limited(self, mock_time, mock_get):
         """Test HTTP connectivity test rate limiting."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         # Mock time to simulate recent request
@@ -1218,8 +1178,6 @@ class TestConnectivityTesting:
     @patch("src.kpf.connectivity.ConnectivityChecker._test_socket_connectivity")
     def test_check_port_connectivity_socket_failure(self, mock_socket, mock_http):
         """Test enhanced connectivity check with socket failure."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_socket.return_value = (False, "connection_error_111")
@@ -1233,8 +1191,6 @@ class TestConnectivityTesting:
     @patch("src.kpf.connectivity.ConnectivityChecker._test_socket_connectivity")
     def test_check_port_connectivity_socket_connected_http_success(self, mock_socket, mock_http):
         """Test enhanced connectivity check with socket connected and HTTP success."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         mock_socket.return_value = (True, "connected")
@@ -1246,21 +1202,17 @@ class TestConnectivityTesting:
 
     def test_check_port_connectivity_no_port(self):
         """Test enhanced connectivity check with no port specified."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         result = checker.check_port_connectivity(None)
         assert result is True
 
     @patch("src.kpf.logger.debug.enabled", True)
-    @patch("time.time")
+    @patch("time.monotonic_ns")
     def test_debug_rate_limiting(self, mock_time):
         """Test that debug messages can be rate limited."""
-        from src.kpf.main import debug
-
-        # Mock time to control rate limiting
-        mock_time.side_effect = [1000.0, 1001.0, 1003.0]  # 0s, 1s, 3s timestamps
+        # Mock time to control rate limiting (0s, 1s, 3s timestamps in ns)
+        mock_time.side_effect = [1000 * 10**9, 1001 * 10**9, 1003 * 10**9]
 
         with patch("src.kpf.logger.console.print") as mock_print:
             # First call should print
@@ -1275,11 +1227,21 @@ class TestConnectivityTesting:
             debug.print("Test message", rate_limit=True)
             assert mock_print.call_count == 2
 
+    def test_debug_rate_limit_table_is_bounded(self):
+        """Test that the rate-limit table evicts the oldest entries past its cap."""
+        bounded_debug = Debug()
+        bounded_debug.enabled = True
+        bounded_debug.MAX_TRACKED_MESSAGES = 3
+
+        with patch("src.kpf.logger.console.print"):
+            for i in range(5):
+                bounded_debug.print(f"Message {i}", rate_limit=True)
+
+        assert len(bounded_debug.message_timestamps) == 3
+
     @patch("src.kpf.logger.debug.enabled", True)
     def test_debug_no_rate_limiting(self):
         """Test that debug messages without rate limiting always print."""
-        from src.kpf.main import debug
-
         with patch("src.kpf.logger.console.print") as mock_print:
             # Multiple calls without rate limiting should all print
             debug.print("Test message 1")
@@ -1294,8 +1256,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_mark_http_timeout_start(self, mock_time):
         """Test marking HTTP timeout start."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1310,8 +1270,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_mark_http_timeout_start_already_set(self, mock_time):
         """Test marking HTTP timeout start when already set."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1329,8 +1287,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_mark_http_timeout_end(self, mock_time):
         """Test marking HTTP timeout end."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1346,8 +1302,6 @@ class TestHttpTimeoutRestart:
 
     def test_mark_http_timeout_end_not_set(self):
         """Test marking HTTP timeout end when not set."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1358,8 +1312,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_check_http_timeout_restart_threshold_not_met(self, mock_time):
         """Test HTTP timeout restart check when threshold not met."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         # Set timeout start time
@@ -1372,8 +1324,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_check_http_timeout_restart_threshold_met(self, mock_time):
         """Test HTTP timeout restart check when threshold met."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1389,8 +1339,6 @@ class TestHttpTimeoutRestart:
 
     def test_check_http_timeout_restart_not_set(self):
         """Test HTTP timeout restart check when timeout not set."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         checker = ConnectivityChecker(run_http_health_checks=True)
 
         result = checker.check_http_timeout_restart()
@@ -1399,8 +1347,6 @@ class TestHttpTimeoutRestart:
     @patch("time.time")
     def test_mark_connectivity_success_does_not_reset_http_timeout(self, mock_time):
         """Test that successful connectivity does NOT reset HTTP timeout tracking."""
-        from src.kpf.connectivity import ConnectivityChecker
-
         mock_callback = Mock()
         checker = ConnectivityChecker(debug_callback=mock_callback)
 
@@ -1510,24 +1456,16 @@ class TestContextAndKubeconfig:
         args = ["svc/test-svc", "8080:80", "-n", "default"]
         kubectl_flags = ["--context", "my-cluster"]
 
-        # Mock successful service and endpoint checks
-        def mock_subprocess(*cmd_args, **kwargs):
-            cmd = cmd_args[0]
-            result = Mock()
-            if "get" in cmd and "svc" in cmd:
-                result.returncode = 0
-                result.stdout = '{"metadata": {"name": "test-svc"}}'
-            elif "get" in cmd and "endpoints" in cmd:
-                result.returncode = 0
-                result.stdout = (
-                    '{"subsets": [{"addresses": [{"ip": "10.0.0.1"}], "ports": [{"port": 80}]}]}'
-                )
-            else:
-                result.returncode = 0
-                result.stdout = ""
-            return result
-
-        mock_run.side_effect = mock_subprocess
+        # Mock a successful combined service and endpoints lookup
+        mock_run.return_value = Mock(
+            returncode=0,
+            stdout=(
+                '{"kind": "List", "items": ['
+                '{"kind": "Service", "metadata": {"name": "test-svc"}}, '
+                '{"kind": "Endpoints", "subsets": [{"addresses": [{"ip": "10.0.0.1"}]}]}]}'
+            ),
+            stderr="",
+        )
 
         result = validate_service_and_endpoints(args, kubectl_global_flags=kubectl_flags)
         assert result is True
@@ -1540,8 +1478,6 @@ class TestContextAndKubeconfig:
 
     def test_endpoint_watcher_includes_context_flags(self):
         """Test that EndpointWatcher includes --context in kubectl command."""
-        from src.kpf.watcher import EndpointWatcher
-
         watcher = EndpointWatcher(
             "default",
             "my-service",
@@ -1556,9 +1492,6 @@ class TestContextAndKubeconfig:
             mock_process.stdout = iter([])
             mock_popen.return_value = mock_process
 
-            shutdown_event.clear()
-            restart_event.clear()
-
             def set_shutdown(*args, **kwargs):
                 shutdown_event.set()
                 return mock_process
@@ -1576,13 +1509,8 @@ class TestContextAndKubeconfig:
             get_idx = call_args.index("get")
             assert ctx_idx < get_idx, "Global flags should come before subcommand"
 
-        shutdown_event.clear()
-        restart_event.clear()
-
     def test_network_watchdog_includes_context_flags(self):
         """Test that NetworkWatchdog includes --context in kubectl command."""
-        from src.kpf.network_watchdog import NetworkWatchdog
-
         watchdog = NetworkWatchdog(
             shutdown_event=shutdown_event,
             restart_event=restart_event,
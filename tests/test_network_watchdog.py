@@ -1,10 +1,15 @@
 """Tests for the network watchdog module."""
 
+import errno
+import os
 import socket
+import struct
 import threading
 import time
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from kpf.network_watchdog import NetworkWatchdog
 
 
@@ -90,6 +95,47 @@ class TestNetworkWatchdog:
         assert host is None
         assert port == 443
 
+    @patch("subprocess.run")
+    def test_get_api_server_address_uses_disk_cache(self, mock_run, tmp_path, monkeypatch):
+        """Test the API server URL is reused from disk while the kubeconfig is unchanged."""
+        kubeconfig = tmp_path / "config"
+        kubeconfig.write_text("current-context: test\n")
+        monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+        cache_file = tmp_path / "cache" / "api-server.json"
+        mock_run.return_value = MagicMock(stdout="https://192.168.1.100:6443", returncode=0)
+
+        first = NetworkWatchdog(threading.Event(), threading.Event(), api_server_cache=cache_file)
+        assert first._get_api_server_address() == ("192.168.1.100", 6443)
+        assert mock_run.call_count == 1
+
+        second = NetworkWatchdog(threading.Event(), threading.Event(), api_server_cache=cache_file)
+        assert second._get_api_server_address() == ("192.168.1.100", 6443)
+        assert mock_run.call_count == 1
+
+    @patch("subprocess.run")
+    def test_get_api_server_address_cache_invalidated(self, mock_run, tmp_path, monkeypatch):
+        """Test a kubeconfig change invalidates the cached API server URL."""
+        kubeconfig = tmp_path / "config"
+        kubeconfig.write_text("current-context: test\n")
+        monkeypatch.setenv("KUBECONFIG", str(kubeconfig))
+        cache_file = tmp_path / "api-server.json"
+        mock_run.return_value = MagicMock(stdout="https://192.168.1.100:6443", returncode=0)
+
+        NetworkWatchdog(
+            threading.Event(), threading.Event(), api_server_cache=cache_file
+        )._get_api_server_address()
+
+        # Switching context rewrites the kubeconfig
+        stat = kubeconfig.stat()
+        os.utime(kubeconfig, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        mock_run.return_value = MagicMock(stdout="https://10.0.0.1:443", returncode=0)
+
+        watchdog = NetworkWatchdog(
+            threading.Event(), threading.Event(), api_server_cache=cache_file
+        )
+        assert watchdog._get_api_server_address() == ("10.0.0.1", 443)
+        assert mock_run.call_count == 2
+
     @patch("socket.socket")
     def test_check_connectivity_success(self, mock_socket_class):
         """Test successful connectivity check."""
@@ -143,11 +189,11 @@ class TestNetworkWatchdog:
 
         assert result is False
 
+    @patch("socket.getaddrinfo", side_effect=socket.gaierror("Name resolution failed"))
     @patch("socket.socket")
-    def test_check_connectivity_dns_failure(self, mock_socket_class):
+    def test_check_connectivity_dns_failure(self, mock_socket_class, mock_getaddrinfo):
         """Test connectivity check DNS resolution failure."""
         mock_socket = MagicMock()
-        mock_socket.connect_ex.side_effect = socket.gaierror("Name resolution failed")
         mock_socket_class.return_value = mock_socket
 
         shutdown_event = threading.Event()
@@ -159,6 +205,63 @@ class TestNetworkWatchdog:
         result = watchdog.check_connectivity()
 
         assert result is False
+        mock_socket.connect_ex.assert_not_called()
+
+        # Nothing was cached, so the next check resolves the name again
+        assert watchdog.check_connectivity() is False
+        assert mock_getaddrinfo.call_count == 2
+
+    @patch("socket.getaddrinfo")
+    @patch("socket.socket")
+    def test_check_api_connectivity_caches_resolved_address(
+        self, mock_socket_class, mock_getaddrinfo
+    ):
+        """Test the API server hostname is resolved once and again only after a failure."""
+        mock_socket = MagicMock()
+        mock_socket.connect_ex.side_effect = [0, 0, 111, 0]
+        mock_socket_class.return_value = mock_socket
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.5", 6443))
+        ]
+
+        watchdog = NetworkWatchdog(threading.Event(), threading.Event())
+        watchdog._api_server_host = "api.example.com"
+        watchdog._api_server_port = 6443
+
+        assert watchdog.check_api_connectivity() is True
+        assert watchdog.check_api_connectivity() is True
+        assert mock_getaddrinfo.call_count == 1
+        mock_socket.connect_ex.assert_called_with(("10.0.0.5", 6443))
+
+        assert watchdog.check_api_connectivity() is False
+        assert watchdog.check_api_connectivity() is True
+        assert mock_getaddrinfo.call_count == 2
+
+        # The cached address expires even while probes keep succeeding
+        mock_socket.connect_ex.side_effect = None
+        mock_socket.connect_ex.return_value = 0
+        watchdog._api_server_resolved_at -= 901
+        assert watchdog.check_api_connectivity() is True
+        assert mock_getaddrinfo.call_count == 3
+
+    @patch("socket.getaddrinfo")
+    @patch("socket.socket")
+    def test_check_api_connectivity_ipv6(self, mock_socket_class, mock_getaddrinfo):
+        """Test the probe uses the address family the API server resolves to."""
+        mock_socket = MagicMock()
+        mock_socket.connect_ex.return_value = 0
+        mock_socket_class.return_value = mock_socket
+        mock_getaddrinfo.return_value = [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fd00::1", 6443, 0, 0))
+        ]
+
+        watchdog = NetworkWatchdog(threading.Event(), threading.Event())
+        watchdog._api_server_host = "api.example.com"
+        watchdog._api_server_port = 6443
+
+        assert watchdog.check_api_connectivity() is True
+        mock_socket_class.assert_called_once_with(socket.AF_INET6, socket.SOCK_STREAM)
+        mock_socket.connect_ex.assert_called_once_with(("fd00::1", 6443, 0, 0))
 
     def test_check_api_connectivity_no_host(self):
         """Test API connectivity check returns True when no host is available."""
@@ -171,6 +274,7 @@ class TestNetworkWatchdog:
 
         assert result is True  # Assume OK if we can't determine the address
 
+    @patch("kpf.network_watchdog.sys.platform", "darwin")
     @patch("socket.socket")
     def test_check_local_port_success(self, mock_socket_class):
         """Test successful local port check."""
@@ -186,7 +290,58 @@ class TestNetworkWatchdog:
 
         assert result is True
         mock_socket.connect_ex.assert_called_once_with(("localhost", 8080))
+        mock_socket.close.assert_called_once()
 
+    @patch("kpf.network_watchdog.sys.platform", "darwin")
+    @patch("socket.socket")
+    def test_probe_resets_connection_on_close(self, mock_socket_class):
+        """Test probe sockets linger with zero timeout so close() skips TIME_WAIT."""
+        mock_socket = MagicMock()
+        mock_socket.connect_ex.side_effect = TimeoutError("Connection timed out")
+        mock_socket_class.return_value = mock_socket
+
+        watchdog = NetworkWatchdog(threading.Event(), threading.Event(), local_port=8080)
+
+        assert watchdog.check_local_port() is False
+        mock_socket.setsockopt.assert_called_once_with(
+            socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+        )
+        mock_socket.close.assert_called_once()
+
+    def test_probe_real_connections(self):
+        """Test the non-blocking probe reports connected and refused ports."""
+        watchdog = NetworkWatchdog(threading.Event(), threading.Event())
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            port = server.getsockname()[1]
+            assert watchdog._probe(("127.0.0.1", port)) == 0
+
+        # The listener is closed now, so nothing accepts on the port
+        assert watchdog._probe(("127.0.0.1", port)) != 0
+
+    @patch("kpf.network_watchdog.selectors.DefaultSelector")
+    @patch("socket.socket")
+    def test_probe_gives_up_on_shutdown(self, mock_socket_class, mock_selector_class):
+        """Test a pending connect is abandoned as soon as shutdown is requested."""
+        mock_socket = MagicMock()
+        mock_socket.connect_ex.return_value = errno.EINPROGRESS
+        mock_socket_class.return_value = mock_socket
+        selector = mock_selector_class.return_value.__enter__.return_value
+        selector.select.return_value = []  # The connect never completes
+
+        shutdown_event = threading.Event()
+        shutdown_event.set()
+        watchdog = NetworkWatchdog(shutdown_event, threading.Event())
+
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            watchdog._probe(("10.0.0.1", 6443))
+        assert time.monotonic() - start < 1
+        selector.select.assert_called_once()
+        mock_socket.close.assert_called_once()
+
+    @patch("kpf.network_watchdog.sys.platform", "darwin")
     @patch("socket.socket")
     def test_check_local_port_connection_refused(self, mock_socket_class):
         """Test local port check when connection is refused (zombie tunnel)."""
@@ -202,6 +357,29 @@ class TestNetworkWatchdog:
 
         assert result is False  # Connection refused means tunnel is dead
 
+    def test_check_local_port_reads_proc_net_tcp(self, tmp_path):
+        """Test the Linux local port check reads listening sockets instead of connecting."""
+        header = "  sl  local_address rem_address   st tx_queue rx_queue\n"
+        tcp = tmp_path / "tcp"
+        tcp.write_text(
+            header
+            + "   0: 0100007F:1F90 00000000:0000 0A 00000000:00000000\n"  # 127.0.0.1:8080 LISTEN
+            + "   1: 0100007F:1F91 0100007F:C350 01 00000000:00000000\n"  # :8081 ESTABLISHED
+        )
+        tcp6 = tmp_path / "tcp6"  # Missing tables are skipped
+
+        watchdog = NetworkWatchdog(threading.Event(), threading.Event(), local_port=8080)
+        with (
+            patch("kpf.network_watchdog.sys.platform", "linux"),
+            patch("kpf.network_watchdog._PROC_NET_TCP", (str(tcp), str(tcp6))),
+            patch("socket.socket") as mock_socket_class,
+        ):
+            assert watchdog.check_local_port() is True
+            watchdog.local_port = 8081
+            assert watchdog.check_local_port() is False
+
+        mock_socket_class.assert_not_called()
+
     def test_check_local_port_no_port_configured(self):
         """Test local port check returns True when no port is configured."""
         shutdown_event = threading.Event()
@@ -263,11 +441,25 @@ class TestNetworkWatchdog:
         mock_api.assert_called_once()
         mock_local.assert_called_once()
 
-    @patch.object(NetworkWatchdog, "check_connectivity")
-    def test_failure_threshold_triggers_restart(self, mock_check):
-        """Test that reaching failure threshold triggers restart event."""
-        mock_check.return_value = False
+    @staticmethod
+    def _run_checks(watchdog, results):
+        """Run the watchdog loop on this thread, one iteration per check result."""
+        remaining = list(results)
+
+        def check():
+            result = remaining.pop(0)
+            if not remaining:
+                watchdog.shutdown_event.set()
+            return result
 
+        with (
+            patch.object(watchdog, "check_connectivity", side_effect=check),
+            patch.object(watchdog.shutdown_event, "wait"),
+        ):
+            watchdog.run()
+
+    def test_failure_threshold_triggers_restart(self):
+        """Test that reaching failure threshold triggers restart event."""
         shutdown_event = threading.Event()
         restart_event = threading.Event()
         watchdog = NetworkWatchdog(
@@ -277,45 +469,27 @@ class TestNetworkWatchdog:
             failure_threshold=2,
         )
 
-        # Start the watchdog
-        watchdog.start()
-
-        # Wait for initial delay (2s) plus enough time for 2 failures
-        # Use a loop to check periodically instead of fixed sleep
-        for _ in range(60):  # Check up to 3 seconds
-            if restart_event.is_set():
-                break
-            time.sleep(0.05)
-
-        # Signal shutdown
-        shutdown_event.set()
-        watchdog.join(timeout=1)
+        self._run_checks(watchdog, [False, False])
 
         # Verify restart was triggered
         assert restart_event.is_set()
 
-    @patch.object(NetworkWatchdog, "check_connectivity")
-    def test_recovery_resets_failure_count(self, mock_check):
+    def test_recovery_resets_failure_count(self):
         """Test that successful check resets failure count."""
-        # First call fails, second succeeds
-        mock_check.side_effect = [False, True, True, True, True]
-
         shutdown_event = threading.Event()
         restart_event = threading.Event()
         watchdog = NetworkWatchdog(
             shutdown_event,
             restart_event,
             interval=0.05,
-            failure_threshold=3,
+            failure_threshold=2,
         )
 
-        watchdog.start()
-        time.sleep(0.3)
-        shutdown_event.set()
-        watchdog.join(timeout=1)
+        # Failures on either side of a recovery never add up to the threshold
+        self._run_checks(watchdog, [False, True, False, True])
 
-        # Restart should not have been triggered (only 1 failure before recovery)
         assert not restart_event.is_set()
+        assert watchdog.consecutive_failures == 0
 
     @patch.object(NetworkWatchdog, "check_connectivity")
     def test_shutdown_stops_thread(self, mock_check):